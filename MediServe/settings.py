@@ -84,6 +84,32 @@ DATABASES = { # <-- FIX: The entire DATABASES block must be present
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Login/signup token buckets, file-based so every worker shares them. One
+    # entry per IP and per username tried; they expire within ten minutes, but
+    # an attack spread over many names must not push past MAX_ENTRIES, where
+    # the cache deletes a random third of the buckets and refills them early.
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'throttle',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    # Throttle rejection counters (one entry per rule), kept out of the bucket
+    # cache so culling there can never reset them. `manage.py throttle_stats`
+    # reads them from its own process.
+    'throttle-stats': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'throttle-stats',
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -119,6 +145,31 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# In production collectstatic writes content-hashed names plus .gz/.br variants
+# (core/assets.py). The manifest storage fails every {% static %} until
+# collectstatic has run, so development (and `manage.py test`, which switches
+# DEBUG off after settings load) keeps plain names.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': ('django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+                    else 'core.assets.PrecompressedManifestStaticFilesStorage'),
+    },
+}
+
+# Let Django serve STATIC_ROOT itself when no web server sits in front of it.
+SERVE_STATIC = False
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+
+# source image -> (variant name prefix, widths); see `manage.py build_image_variants`
+IMAGE_VARIANTS = {
+    'core/img/Medicine Imagee.png': ('medicine', [160, 320]),
+    'core/img/MediServe.png': ('logo', [111, 222]),
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -129,4 +180,42 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # --- Media/File Upload Configuration ---
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+
+# --- Buffered Feedback/Activity Ingestion (see core/ingest.py) ---
+
+INGEST = {
+    'BUFFERED': True,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 5.0,  # seconds
+    'SPOOL_DIR': BASE_DIR / 'spool',
+}
+
+
+# --- Senior/PWD Pricing (see core/pricing.py; run `manage.py recompute_pricing` after changing) ---
+
+PRICING = {
+    'DISCOUNT_RATE': '0.20',
+    'VAT_RATE': '0.12',
+    'VAT_EXEMPT': True,
+}
+
+
+# --- SQLite Maintenance (see core/maintenance.py, run `manage.py dbmaintain` from cron) ---
+
+DB_MAINTENANCE = {
+    'VACUUM_TIME_BUDGET': 5.0,  # seconds per run
+    'SESSION_BATCH_SIZE': 500,
+    'HISTORY_FILE': BASE_DIR / 'dbmaintain-history.jsonl',
+    'WARN_FILE_BYTES': 1024 ** 3,
+}
+
+
+# --- Login/Signup Throttling (see core/throttle.py) ---
+
+AUTH_THROTTLE = {
+    # Only overrides; rules and the other defaults live in core/throttle.py DEFAULTS.
+    'CACHE_ALIAS': 'throttle',
+    'STATS_CACHE_ALIAS': 'throttle-stats',
+}
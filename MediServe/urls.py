@@ -1,9 +1,10 @@
 # MediServe/urls.py (Project Level)
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings # <-- ADDED
 from django.conf.urls.static import static # <-- ADDED
+from core.assets import serve_static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,4 +13,8 @@ urlpatterns = [
 
 # This is essential for serving media files (user uploads) during development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) # <-- ADDED
\ No newline at end of file
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT) # <-- ADDED
+
+# Hashed, precompressed static files when there is no nginx/Apache in front (see core/assets.py)
+if settings.SERVE_STATIC:
+    urlpatterns += [re_path(r'^%s(?P<path>.*)$' % settings.STATIC_URL.lstrip('/'), serve_static)]
@@ -1,3 +1,27 @@
 from django.contrib import admin
 
+from .models import Announcement, Branch, BranchStock, Feedback
+
+
 # Register your models here.
+@admin.register(Announcement)
+class AnnouncementAdmin(admin.ModelAdmin):
+    list_display = ('title', 'is_pinned', 'publish_at', 'expires_at')
+    list_filter = ('is_pinned',)
+
+
+@admin.register(Feedback)
+class FeedbackAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'user', 'created_at')
+    date_hierarchy = 'created_at'
+
+
+class BranchStockInline(admin.TabularInline):
+    model = BranchStock
+    extra = 0
+
+
+@admin.register(Branch)
+class BranchAdmin(admin.ModelAdmin):
+    list_display = ('name', 'is_default')
+    inlines = [BranchStockInline]
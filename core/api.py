@@ -0,0 +1,165 @@
+# core/api.py
+
+"""
+Read-only JSON API for the lobby kiosk, the SMS gateway and mobile clients.
+
+Responses are built from ``.values()`` rows (no model instances), use compact
+separators and carry a content ETag, so a client polling every few seconds
+gets an empty 304 unless something actually changed.
+"""
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
+
+from .models import BranchStock, Medicine, Order
+from .order_queue import queue_position
+
+LOW_STOCK_THRESHOLD = 10
+MAX_BATCH_IDS = 100
+
+# Public field name -> Medicine.values() lookup
+CATALOG_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'generic_name': 'generic_name',
+    'dosage': 'dosage',
+    'formulation': 'formulation',
+    'price': 'price',
+    'stock': 'total_stock',
+}
+DEFAULT_CATALOG_FIELDS = ('id', 'name', 'dosage', 'price', 'status')
+
+ACTIVE_ORDER_STATUSES = ('Pending', 'Processing', 'Shipped')
+
+
+def stock_status(quantity):
+    # Same thresholds as the catalog badges in medicine_list.html
+    if quantity > LOW_STOCK_THRESHOLD:
+        return 'in_stock'
+    if quantity > 0:
+        return 'low_stock'
+    return 'out_of_stock'
+
+
+def _error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _etagged_json(request, payload, private=False):
+    body = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+    etag = quote_etag(hashlib.md5(body.encode('utf-8')).hexdigest())
+    # Returns a 304 when If-None-Match matches, otherwise None.
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type='application/json')
+    response.headers['ETag'] = etag
+    # Always revalidate; the ETag makes that cheap.
+    patch_cache_control(response, no_cache=True, **({'private': True} if private else {'public': True}))
+    return response
+
+
+def _parse_ids(raw):
+    ids = [int(value) for value in raw.split(',') if value.strip()]
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f"At most {MAX_BATCH_IDS} ids per request.")
+    return ids
+
+
+@require_GET
+def medicine_catalog(request):
+    """
+    GET /api/medicines/?fields=id,name,stock,status&ids=1,2,3
+
+    ``fields`` selects a sparse subset of CATALOG_FIELDS plus ``status``;
+    ``ids`` batches lookups of specific medicines.
+    """
+    requested = request.GET.get('fields')
+    fields = [f.strip() for f in requested.split(',') if f.strip()] if requested else list(DEFAULT_CATALOG_FIELDS)
+    unknown = set(fields) - set(CATALOG_FIELDS) - {'status'}
+    if unknown:
+        return _error(f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                      f"Allowed: {', '.join([*CATALOG_FIELDS, 'status'])}.")
+
+    medicines = Medicine.objects.order_by('name')
+    if 'ids' in request.GET:
+        try:
+            medicines = medicines.filter(pk__in=_parse_ids(request.GET['ids']))
+        except ValueError as e:
+            return _error(f"Invalid ids: {e}")
+
+    needs_stock = 'stock' in fields or 'status' in fields
+    if needs_stock:
+        medicines = medicines.with_stock()
+    lookups = {CATALOG_FIELDS[f] for f in fields if f in CATALOG_FIELDS}
+    if needs_stock:
+        lookups.add('total_stock')
+
+    items = []
+    for row in medicines.values(*lookups):
+        item = {f: row[CATALOG_FIELDS[f]] for f in fields if f in CATALOG_FIELDS}
+        if 'status' in fields:
+            item['status'] = stock_status(row['total_stock'])
+        items.append(item)
+    return _etagged_json(request, {'medicines': items})
+
+
+@require_GET
+def medicine_stock(request, medicine_id):
+    """GET /api/medicines/<id>/stock/ -> total, status and per-branch quantities."""
+    branches = list(
+        BranchStock.objects.filter(medicine_id=medicine_id)
+        .order_by('branch__name')
+        .values('branch_id', 'branch__name', 'quantity')
+    )
+    if not branches and not Medicine.objects.filter(pk=medicine_id).exists():
+        return _error("Medicine not found.", status=404)
+    total = sum(row['quantity'] for row in branches)
+    return _etagged_json(request, {
+        'id': medicine_id,
+        'stock': total,
+        'status': stock_status(total),
+        'branches': [
+            {'id': row['branch_id'], 'name': row['branch__name'], 'stock': row['quantity']}
+            for row in branches
+        ],
+    })
+
+
+@require_GET
+def order_status(request):
+    """GET /api/orders/status/ -> the signed-in user's open orders and queue positions."""
+    if not request.user.is_authenticated:
+        return _error("Authentication required.", status=401)
+
+    orders = list(
+        Order.objects.filter(user=request.user, status__in=ACTIVE_ORDER_STATUSES)
+        .order_by('-order_date')
+        .annotate(item_count=Count('items'))
+        .values('id', 'status', 'total_price', 'order_date', 'branch_id', 'branch__name', 'item_count')
+    )
+    positions = {}
+    for o in orders:
+        if o['status'] == 'Processing' and o['branch_id']:
+            # Served from the shared per-branch queue, not a query per poller.
+            positions[o['id']] = queue_position(o['id'], o['branch_id'])
+
+    return _etagged_json(request, {
+        'orders': [
+            {
+                'id': o['id'],
+                'status': o['status'],
+                'total': o['total_price'],
+                'items': o['item_count'],
+                'branch': o['branch__name'],
+                'queue_position': positions.get(o['id']),
+            }
+            for o in orders
+        ],
+    }, private=True)
@@ -0,0 +1,128 @@
+# core/feeds.py
+
+"""
+Cached announcement feed shared by the menus, the JSON endpoint and the Atom feed.
+
+The feed is built once and kept in the cache until an announcement is written
+(see core/signals.py) or the next scheduled publish/expiry time passes, so the
+menu preview rendered on every login costs no query in the steady state.
+"""
+
+import hashlib
+from datetime import timedelta
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import Min
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from .models import Announcement
+
+FEED_CACHE_KEY = 'announcements:feed'
+FEED_SIZE = 20
+# Announcement writes only clear this worker's copy; other workers may keep
+# showing an edited or deleted post for up to five minutes.
+FEED_TTL = 300
+
+FEED_FIELDS = ('id', 'title', 'content', 'is_pinned', 'publish_at', 'expires_at', 'updated_at')
+
+
+def _build_feed(now):
+    items = list(Announcement.objects.live(now).values(*FEED_FIELDS)[:FEED_SIZE])
+
+    # Drop the cached copy no later than the next post goes live or a listed one expires.
+    boundaries = [item['expires_at'] for item in items if item['expires_at']]
+    next_publish = Announcement.objects.filter(publish_at__gt=now).aggregate(next=Min('publish_at'))['next']
+    if next_publish:
+        boundaries.append(next_publish)
+    timeout = FEED_TTL
+    if boundaries:
+        timeout = max(1, min(timeout, int((min(boundaries) - now).total_seconds()) + 1))
+
+    signature = ';'.join(f"{item['id']}:{item['updated_at'].isoformat()}" for item in items)
+    feed = {
+        'items': items,
+        'etag': hashlib.md5(signature.encode('utf-8')).hexdigest(),
+        'last_modified': max(
+            (max(item['updated_at'], item['publish_at']) for item in items),
+            default=now - timedelta(days=365),
+        ),
+    }
+    return feed, timeout
+
+
+def get_feed():
+    """Return {'items': [...], 'etag': str, 'last_modified': datetime}, cached."""
+    feed = cache.get(FEED_CACHE_KEY)
+    if feed is None:
+        feed, timeout = _build_feed(timezone.now())
+        cache.set(FEED_CACHE_KEY, feed, timeout)
+    return feed
+
+
+def invalidate_feed():
+    cache.delete(FEED_CACHE_KEY)
+
+
+def recent_announcements(count=2):
+    return get_feed()['items'][:count]
+
+
+def feed_etag(request, *args, **kwargs):
+    return get_feed()['etag']
+
+
+def feed_last_modified(request, *args, **kwargs):
+    return get_feed()['last_modified']
+
+
+@condition(etag_func=feed_etag, last_modified_func=feed_last_modified)
+def announcements_json(request):
+    # (11.6) Compact feed for kiosks/mobile clients; polls with If-None-Match get a 304.
+    items = [
+        {
+            'id': item['id'],
+            'title': item['title'],
+            'content': item['content'],
+            'pinned': item['is_pinned'],
+            'published': item['publish_at'].isoformat(),
+            'expires': item['expires_at'].isoformat() if item['expires_at'] else None,
+        }
+        for item in get_feed()['items']
+    ]
+    return JsonResponse({'items': items}, json_dumps_params={'separators': (',', ':')})
+
+
+class AnnouncementAtomFeed(Feed):
+    # (11.7) Atom view of the same cached feed
+    feed_type = Atom1Feed
+    title = "MediServe Barangay Announcements"
+    subtitle = "Important notices from the Barangay and MediServe."
+
+    def link(self):
+        return reverse('announcements')
+
+    def items(self):
+        return get_feed()['items']
+
+    def item_title(self, item):
+        return item['title']
+
+    def item_description(self, item):
+        return item['content']
+
+    def item_link(self, item):
+        return f"{reverse('announcements')}#post-{item['id']}"
+
+    def item_pubdate(self, item):
+        return item['publish_at']
+
+    def item_updateddate(self, item):
+        return item['updated_at']
+
+
+announcements_atom = condition(etag_func=feed_etag, last_modified_func=feed_last_modified)(AnnouncementAtomFeed())
@@ -0,0 +1,251 @@
+# core/ingest.py
+
+"""
+Write-behind ingestion for feedback and activity events.
+
+Page views and cart events are appended to an in-process buffer instead of
+being INSERTed one by one. A background ``ingest-flusher`` thread writes them
+with ``bulk_create`` every ``FLUSH_INTERVAL`` seconds, or as soon as the buffer
+reaches ``BATCH_SIZE`` entries. Request threads never write themselves, so event
+logging does not compete with checkouts for the SQLite write lock; only
+``atexit`` and ``manage.py flush_ingest`` flush inline.
+
+Every buffered entry is also appended to a per-process spool file under
+``SPOOL_DIR``. A flush rotates the spool aside and deletes it once the batch
+is committed, so entries left behind by a killed worker (or a failed flush)
+are replayed by the next process that starts buffering, or by
+``manage.py flush_ingest``.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ActivityEvent, Feedback
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # False writes every entry immediately (no buffering, no spool).
+    'BUFFERED': True,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 5.0,
+    'SPOOL_DIR': None,
+}
+
+MODELS = {
+    'feedback': Feedback,
+    'activity': ActivityEvent,
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'INGEST', {}))
+    return config
+
+
+def _spool_owner(path):
+    # ingest-<pid>.jsonl, ingest-<pid>-<id>.batch, <either>.replaying-<pid>
+    if '.replaying-' in path.name:
+        return int(path.name.rsplit('-', 1)[1])
+    return int(path.name.split('-')[1].split('.')[0])
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_entries(entries):
+    """INSERT buffered entries, one bulk_create per model. Returns rows written."""
+    objects = defaultdict(list)
+    for entry in entries:
+        fields = dict(entry)
+        model = MODELS[fields.pop('kind')]
+        fields['created_at'] = parse_datetime(fields['created_at'])
+        objects[model].append(model(**fields))
+
+    try:
+        with transaction.atomic():
+            for model, rows in objects.items():
+                model.objects.bulk_create(rows)
+        return len(entries)
+    except IntegrityError:
+        # Usually a medicine/user deleted while its events sat in the buffer;
+        # save what we can row by row rather than losing the whole batch.
+        written = 0
+        for model, rows in objects.items():
+            for row in rows:
+                try:
+                    with transaction.atomic():
+                        row.save(force_insert=True)
+                    written += 1
+                except IntegrityError:
+                    logger.warning("Dropped unwritable %s entry: %s", model.__name__, row.__dict__)
+        return written
+
+
+class WriteBehindBuffer:
+
+    def __init__(self, batch_size, flush_interval, spool_dir=None):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_dir = Path(spool_dir) if spool_dir else None
+        self._pending = []
+        self._lock = threading.Lock()
+        # Serialises flush() and replay_spool() so a batch is never written twice.
+        self._flush_lock = threading.Lock()
+        self._worker = None
+        self._wake = threading.Event()
+        if self.spool_dir:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            # A previous process with our pid (common in containers) may have left
+            # a spool behind; set it aside for replay instead of adopting it.
+            if self.spool_path.exists():
+                self.spool_path.rename(self._batch_path())
+
+    @property
+    def spool_path(self):
+        # Resolved per call so a forked worker never shares its parent's file.
+        return self.spool_dir / f"ingest-{os.getpid()}.jsonl"
+
+    def _batch_path(self):
+        return self.spool_dir / f"ingest-{os.getpid()}-{uuid.uuid4().hex}.batch"
+
+    def record(self, kind, **fields):
+        entry = {'kind': kind, 'created_at': timezone.now().isoformat(), **fields}
+        with self._lock:
+            if self.spool_dir:
+                with open(self.spool_path, 'a', encoding='utf-8') as spool:
+                    spool.write(json.dumps(entry) + '\n')
+            self._pending.append(entry)
+            self._start_worker()
+            # Never write on the caller's (request) thread; a full batch just
+            # wakes the flusher early instead of waiting out the interval.
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+
+    def flush(self):
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+            claimed = None
+            if batch and self.spool_dir and self.spool_path.exists():
+                claimed = self.spool_path.rename(self._batch_path())
+        if not batch:
+            return 0
+        try:
+            written = write_entries(batch)
+        except Exception:
+            # The rotated spool file stays on disk and is replayed later.
+            logger.exception("Flushing %d buffered entries failed", len(batch))
+            return 0
+        if claimed:
+            claimed.unlink(missing_ok=True)
+        return written
+
+    def replay_spool(self):
+        """Write entries left on disk by dead workers or by our own failed flushes."""
+        if not self.spool_dir:
+            return 0
+        with self._flush_lock:
+            return self._replay_spool()
+
+    def _replay_spool(self):
+        replayed = 0
+        for path in sorted(self.spool_dir.glob('ingest-*')):
+            owner = _spool_owner(path)
+            if owner == os.getpid():
+                if path.suffix != '.batch':
+                    continue  # our active spool
+            elif _pid_alive(owner):
+                continue  # another live worker's files
+            claimed = path.with_name(f"{path.name.split('.replaying-')[0]}.replaying-{os.getpid()}")
+            try:
+                path.rename(claimed)
+            except FileNotFoundError:
+                continue  # another worker got there first
+            entries = [json.loads(line) for line in claimed.read_text(encoding='utf-8').splitlines() if line]
+            try:
+                replayed += write_entries(entries)
+            except Exception:
+                claimed.rename(path)
+                raise
+            claimed.unlink()
+        if replayed:
+            logger.info("Replayed %d spooled entries", replayed)
+        return replayed
+
+    def _start_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='ingest-flusher', daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        try:
+            self.replay_spool()
+        except Exception:
+            logger.exception("Replaying the ingest spool failed")
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                self.replay_spool()
+            except Exception:
+                logger.exception("Background ingest flush failed")
+            close_old_connections()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            config = get_config()
+            _buffer = WriteBehindBuffer(config['BATCH_SIZE'], config['FLUSH_INTERVAL'], config['SPOOL_DIR'])
+            atexit.register(_buffer.flush)
+        return _buffer
+
+
+def _record(kind, **fields):
+    if get_config()['BUFFERED']:
+        get_buffer().record(kind, **fields)
+    else:
+        write_entries([{'kind': kind, 'created_at': timezone.now().isoformat(), **fields}])
+
+
+def record_feedback(user, subject, details):
+    _record('feedback', user_id=user.pk if user else None, subject=subject, details=details)
+
+
+def record_event(event_type, user=None, medicine=None, quantity=None):
+    _record(
+        'activity',
+        event_type=event_type,
+        user_id=user.pk if user else None,
+        medicine_id=medicine.pk if medicine else None,
+        quantity=quantity,
+    )
@@ -0,0 +1,214 @@
+# core/maintenance.py
+
+"""
+Routine upkeep for the SQLite database, run by ``manage.py dbmaintain``.
+
+Every step is short and bounded so it can run from cron while the site is
+up: expired sessions are deleted in small batches, free pages are returned
+to the filesystem a slice at a time with ``PRAGMA incremental_vacuum`` until
+the time budget runs out, and ``PRAGMA optimize`` only re-analyzes tables
+whose statistics have drifted. Each step commits on its own, so the write
+lock is never held for longer than one batch or slice.
+
+Incremental vacuum needs ``auto_vacuum = INCREMENTAL``. Databases created
+before that was switched on need one full ``VACUUM`` to convert
+(``dbmaintain --enable-incremental-vacuum``, best done in a quiet hour).
+"""
+
+import json
+import time
+from importlib import import_module
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+DEFAULTS = {
+    # Seconds the incremental vacuum may run per invocation.
+    'VACUUM_TIME_BUDGET': 5.0,
+    'VACUUM_PAGES_PER_SLICE': 256,
+    'SESSION_BATCH_SIZE': 500,
+    # Rows sampled per index by PRAGMA optimize (0 = no limit).
+    'ANALYSIS_LIMIT': 1000,
+    # JSON lines file with one size snapshot per run; None keeps no history.
+    'HISTORY_FILE': None,
+    # Warn when the file passes this size; well before SQLite itself struggles,
+    # but past the point where a single writer starts to hurt checkouts.
+    'WARN_FILE_BYTES': 1024 ** 3,
+}
+
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'DB_MAINTENANCE', {}))
+    return config
+
+
+def _pragma(cursor, statement):
+    cursor.execute(f"PRAGMA {statement}")
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def quick_check(using='default', max_errors=10):
+    """Return the problems PRAGMA quick_check found; an empty list means the file is sound."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"PRAGMA quick_check({int(max_errors)})")
+        rows = [row[0] for row in cursor.fetchall()]
+    return [] if rows == ['ok'] else rows
+
+
+def purge_expired_sessions(batch_size, now=None):
+    """Delete expired database sessions ``batch_size`` rows per statement. Returns rows deleted."""
+    if settings.SESSION_ENGINE != 'django.contrib.sessions.backends.db':
+        # File/cache sessions: let the backend do it; there is nothing to batch.
+        import_module(settings.SESSION_ENGINE).SessionStore.clear_expired()
+        return 0
+    now = now or timezone.now()
+    deleted = 0
+    while True:
+        keys = list(Session.objects.filter(expire_date__lt=now).values_list('pk', flat=True)[:batch_size])
+        if not keys:
+            return deleted
+        deleted += Session.objects.filter(pk__in=keys).delete()[0]
+
+
+def auto_vacuum_mode(using='default'):
+    with connections[using].cursor() as cursor:
+        return AUTO_VACUUM_MODES.get(_pragma(cursor, 'auto_vacuum'), 'unknown')
+
+
+def enable_incremental_vacuum(using='default'):
+    """Switch the file to auto_vacuum=INCREMENTAL. Rewrites the whole file (full VACUUM)."""
+    with connections[using].cursor() as cursor:
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cursor.execute("VACUUM")
+
+
+def incremental_vacuum(budget, pages_per_slice, using='default'):
+    """
+    Release free pages one slice at a time until none are left or ``budget``
+    seconds have passed. Returns (pages released, pages still free).
+    """
+    released = 0
+    deadline = time.monotonic() + budget
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        free = _pragma(cursor, 'freelist_count')
+        if _pragma(cursor, 'auto_vacuum') != 2:
+            return 0, free
+        while free and time.monotonic() < deadline:
+            # The sqlite3 module steps a statement without result columns only
+            # once (= one page); executescript() runs it to completion.
+            connection.connection.executescript(f"PRAGMA incremental_vacuum({int(pages_per_slice)})")
+            remaining = _pragma(cursor, 'freelist_count')
+            released += free - remaining
+            free = remaining
+    return released, free
+
+
+def optimize(analysis_limit, full=False, using='default'):
+    """
+    Refresh planner statistics. Runs a full ANALYZE the first time (or when
+    asked), afterwards PRAGMA optimize, which only re-analyzes what changed.
+    Returns the statement that ran.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if full or cursor.fetchone() is None:
+            cursor.execute("ANALYZE")
+            return 'ANALYZE'
+        cursor.execute(f"PRAGMA analysis_limit = {int(analysis_limit)}")
+        cursor.execute("PRAGMA optimize")
+        return 'PRAGMA optimize'
+
+
+def _object_sizes(cursor):
+    # dbstat is an optional compile-time module; most builds ship it.
+    try:
+        cursor.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+    except DatabaseError:
+        return {}
+    return dict(cursor.fetchall())
+
+
+def table_report(using='default'):
+    """
+    Per-table row counts and on-disk sizes, with each table's indexes.
+
+    SQLite keeps no per-index hit counters, so "usage" here is what the
+    planner sees: the index size and, from sqlite_stat1, how many rows one
+    key matches on average (close to the table's row count = rarely useful).
+    """
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        sizes = _object_sizes(cursor)
+        stats = {}
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if cursor.fetchone():
+            cursor.execute("SELECT idx, stat FROM sqlite_stat1 WHERE idx IS NOT NULL")
+            stats = dict(cursor.fetchall())
+        cursor.execute("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' ORDER BY name")
+        indexes = cursor.fetchall()
+
+        tables = []
+        for table in sorted(connection.introspection.table_names(cursor)):
+            cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+            table_indexes = []
+            for name, tbl_name in indexes:
+                if tbl_name != table:
+                    continue
+                stat = stats.get(name, '').split()
+                table_indexes.append({
+                    'name': name,
+                    'bytes': sizes.get(name),
+                    # "<rows> <avg rows per first column> ..."
+                    'rows_per_key': int(stat[1]) if len(stat) > 1 else None,
+                })
+            tables.append({
+                'name': table,
+                'rows': cursor.fetchone()[0],
+                'bytes': sizes.get(table),
+                'indexes': table_indexes,
+            })
+    return tables
+
+
+def file_stats(using='default'):
+    """Size of the database file (plus WAL) and how much of it is free pages."""
+    connection = connections[using]
+    path = Path(connection.settings_dict['NAME'])
+    with connection.cursor() as cursor:
+        page_size = _pragma(cursor, 'page_size')
+        page_count = _pragma(cursor, 'page_count')
+        free_pages = _pragma(cursor, 'freelist_count')
+    wal = Path(f"{path}-wal")
+    return {
+        'file_bytes': path.stat().st_size if path.exists() else page_size * page_count,
+        'wal_bytes': wal.stat().st_size if wal.exists() else 0,
+        'free_bytes': page_size * free_pages,
+        'page_size': page_size,
+    }
+
+
+def last_snapshot(history_file):
+    """The most recent snapshot in ``history_file``, or None if there is none yet."""
+    path = Path(history_file)
+    if not path.exists():
+        return None
+    lines = path.read_text(encoding='utf-8').splitlines()
+    return json.loads(lines[-1]) if lines else None
+
+
+def record_history(history_file, snapshot):
+    """Append ``snapshot`` and return the previous one (None on the first run)."""
+    previous = last_snapshot(history_file)
+    path = Path(history_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as history:
+        history.write(json.dumps(snapshot) + '\n')
+    return previous
@@ -0,0 +1,42 @@
+# core/management/commands/_bench.py
+
+"""Shared helpers for the bench_* management commands."""
+
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def bench_database(on_disk=False):
+    """
+    Run the block against a throwaway test database, never db.sqlite3.
+
+    SQLite test databases live in memory by default; pass ``on_disk=True`` when
+    the benchmark is about write/lock behaviour of the real database file.
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    old_test_name = connection.settings_dict['TEST'].get('NAME')
+    with tempfile.TemporaryDirectory() as tmp:
+        if on_disk:
+            connection.settings_dict['TEST']['NAME'] = str(Path(tmp) / 'bench.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            connection.settings_dict['TEST']['NAME'] = old_test_name
+            teardown_test_environment()
+
+
+@contextmanager
+def timed(results, label):
+    """Store (cpu seconds, wall seconds) spent in the block under results[label]."""
+    cpu, wall = time.process_time(), time.perf_counter()
+    yield
+    results[label] = (time.process_time() - cpu, time.perf_counter() - wall)
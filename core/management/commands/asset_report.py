@@ -0,0 +1,191 @@
+# core/management/commands/asset_report.py
+
+import gzip
+import re
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateSyntaxError
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from core.models import Announcement, Medicine, Order, OrderItem, UserProfile
+from ._bench import bench_database
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip numbers are still reported
+    brotli = None
+
+STATIC_REF = re.compile(r'(?:src|href)="/static/([^"]+)"|srcset="/static/([^" ]+)')
+PICTURE_FALLBACK = re.compile(r'(<picture>.*?)<img [^>]*>(.*?</picture>)', re.S)
+# core/img/variants/<prefix>-<width>.<ext>, written by build_image_variants
+VARIANT_NAME = re.compile(r'/variants/([^/]+)-\d+\.(?:webp|png)$')
+
+TEXT_EXTENSIONS = ('.css', '.js', '.svg')
+
+
+def compressed_size(data):
+    sizes = [len(gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        sizes.append(len(brotli.compress(data, quality=11)))
+    return min(sizes)
+
+
+def sample_context():
+    """One shared context with a realistic amount of data for every page."""
+    user = User(id=1, username='resident', first_name='Juan', last_name='Dela Cruz')
+    medicines = [
+        Medicine(id=i, name=f'Medicine {i}', generic_name='Generic', dosage='500mg', formulation='Tablet',
+                 price=Decimal('12.50'), description='Sample description.')
+        for i in range(1, 25)
+    ]
+    for medicine in medicines:
+        # What with_stock() would annotate
+        medicine.total_stock = (medicine.id * 7) % 30
+    orders = [Order(id=i, user=user, status='Processing', total_price=Decimal('125.00')) for i in range(1, 11)]
+    items = [OrderItem(id=i, order=orders[0], medicine=medicines[i], quantity=2, unit_price=Decimal('12.50'))
+             for i in range(1, 6)]
+    return {
+        'user': user,
+        'medicines': medicines,
+        'medicine': medicines[0],
+        'orders': orders,
+        'user_orders': orders,
+        'past_orders': orders,
+        'order': orders[0],
+        'current_order': orders[0],
+        'items': items,
+        'total': Decimal('125.00'),
+        'profile': UserProfile(user=user, first_name='Juan', last_name='Dela Cruz', date_of_birth='1950-01-01',
+                               sex='Male', is_senior=True),
+        'announcements': [Announcement(id=i, title=f'Announcement {i}', content='Sample announcement.',
+                                       publish_at=timezone.now()) for i in range(1, 6)],
+        'recent_announcements': [{'title': 'Vaccination drive', 'content': 'Scheduled this Friday.',
+                                  'is_pinned': True, 'publish_at': timezone.now()}] * 2,
+        'recent_announcement': {'title': 'Inventory check', 'content': 'New protocol starting tomorrow.'},
+        'now': timezone.now(),
+        'records': [{'id': i, 'medicine': 'Paracetamol', 'action': 'Stock In', 'date': '2024-09-01', 'qty': 100}
+                    for i in range(1, 11)],
+        'monthly_sales': [1200, 1500, 1800, 2500],
+        'top_sellers': [{'name': 'Paracetamol', 'count': 500}],
+        'current_number': 42,
+        'estimated_wait': '15-20 minutes',
+        'is_admin': True,
+    }
+
+
+def original_image(name):
+    """The full-size source image a generated variant stands in for, else ``name`` itself."""
+    match = VARIANT_NAME.search(name)
+    if match:
+        for source, (prefix, _) in settings.IMAGE_VARIANTS.items():
+            if prefix == match.group(1):
+                return source
+    return name
+
+
+def file_size(name, baseline=None):
+    if baseline is not None and (baseline / 'core' / 'static' / name).is_file():
+        return (baseline / 'core' / 'static' / name).stat().st_size
+    found = finders.find(name)
+    return Path(found).stat().st_size if found else 0
+
+
+class Command(BaseCommand):
+    help = ("Reports bytes per page for every core template before the asset pipeline (full-size images, "
+            "uncompressed HTML/CSS) and after it (resized WebP variants, gzip/brotli).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baseline', type=Path,
+                            help="Root of a checkout from before the pipeline (e.g. made with `git worktree add`); "
+                                 "its templates and CSS are used for the 'before' column.")
+
+    def handle(self, *args, **options):
+        baseline = options['baseline']
+        if baseline is not None and not (baseline / 'core' / 'templates' / 'core').is_dir():
+            raise CommandError(f"{baseline} has no core/templates/core directory.")
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        templates = sorted(Path(__file__).resolve().parents[2].glob('templates/core/*.html'))
+
+        header = (f"{'template':<28} {'html':>7} {'html*':>6} {'assets':>8} {'assets*':>8} "
+                  f"{'before':>8} {'after':>7} {'saved':>6}")
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        totals = [0, 0]
+        with bench_database():
+            context = sample_context()
+            for path in templates:
+                if path.name == 'base.html':
+                    continue
+                try:
+                    html = render_to_string(f'core/{path.name}', context, request)
+                except TemplateSyntaxError as e:
+                    self.stderr.write(f"{path.name:<28} skipped: {e}")
+                    continue
+                old_html = html
+                if baseline:
+                    try:
+                        old_html = self.render_baseline(path.name, context, request, baseline)
+                    except TemplateSyntaxError as e:
+                        self.stderr.write(f"{path.name:<28} baseline unusable, before = today's page: {e}")
+                raw_html, packed_html = len(old_html.encode('utf-8')), compressed_size(html.encode('utf-8'))
+                before_assets = self.before_asset_size(old_html, baseline)
+                after_assets = self.after_asset_size(html)
+                before = raw_html + before_assets
+                after = packed_html + after_assets
+                totals[0] += before
+                totals[1] += after
+                self.stdout.write(
+                    f"{path.name:<28} {raw_html:>7} {packed_html:>6} {before_assets:>8} {after_assets:>8} "
+                    f"{before:>8} {after:>7} {1 - after / before:>6.0%}"
+                )
+        self.stdout.write('-' * len(header))
+        self.stdout.write(f"{'total':<28} {'':>7} {'':>6} {'':>8} {'':>8} {totals[0]:>8} {totals[1]:>7} "
+                          f"{1 - totals[1] / totals[0]:>6.0%}")
+        self.stdout.write("before = uncompressed HTML + full-size images + uncompressed CSS/JS; "
+                          "after (*) = as sent with the pipeline.")
+        if baseline:
+            self.stdout.write(f"before HTML and CSS rendered from {baseline}; pages it lacks use today's templates.")
+        else:
+            self.stdout.write(self.style.WARNING(
+                "before uses today's templates and styles.css, so savings from moving inline styles into "
+                "styles.css are not included; pass --baseline for those."))
+        self.stdout.write("Font Awesome CDN not counted.")
+
+    def render_baseline(self, name, context, request, baseline):
+        # DIRS wins over APP_DIRS, so every {% extends %}/{% include %} resolves
+        # to the baseline copy first.
+        engine = {**settings.TEMPLATES[0], 'DIRS': [baseline / 'core' / 'templates']}
+        with override_settings(TEMPLATES=[engine]):
+            return render_to_string(f'core/{name}', context, request)
+
+    def before_asset_size(self, html, baseline=None):
+        """Bytes of static assets the page pulled in before the pipeline."""
+        # Every <picture> was a plain <img> of the original, so all its
+        # sources collapse onto one full-size file.
+        originals = {original_image(name) for name in self.static_refs(html)}
+        return sum(file_size(name, baseline) for name in originals)
+
+    def after_asset_size(self, html):
+        """Bytes of static assets the page pulls in as sent with the pipeline."""
+        # Browsers that understand a <picture> <source> never fetch its <img> fallback.
+        after = 0
+        for name in set(self.static_refs(PICTURE_FALLBACK.sub(r'\1\2', html))):
+            found = finders.find(name)
+            if not found:
+                continue
+            data = Path(found).read_bytes()
+            after += compressed_size(data) if name.endswith(TEXT_EXTENSIONS) else len(data)
+        return after
+
+    def static_refs(self, html):
+        for match in STATIC_REF.finditer(html):
+            yield (match.group(1) or match.group(2)).replace('%20', ' ')
@@ -0,0 +1,62 @@
+# core/management/commands/bench_ingest.py
+
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from core.ingest import WriteBehindBuffer, write_entries
+from core.models import ActivityEvent, Medicine
+from ._bench import bench_database, timed
+
+
+class Command(BaseCommand):
+    help = "Compares synchronous INSERTs with the write-behind buffer for activity events."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=5000)
+        parser.add_argument('--threads', type=int, default=1, help="Concurrent request threads recording events.")
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        events, threads = options['events'], options['threads']
+        results = {}
+        # On disk, so every synchronous INSERT pays for its own commit like production.
+        with bench_database(on_disk=True), tempfile.TemporaryDirectory() as spool_dir:
+            user = User.objects.create_user(username='resident')
+            medicine = Medicine.objects.create(name='Paracetamol', dosage='500mg', formulation='Tablet', price=5)
+
+            def entry():
+                return {'kind': 'activity', 'created_at': timezone.now().isoformat(), 'event_type': 'catalog_view',
+                        'user_id': user.pk, 'medicine_id': medicine.pk, 'quantity': None}
+
+            def synchronous(count):
+                for _ in range(count):
+                    write_entries([entry()])
+                connection.close()
+
+            buffer = WriteBehindBuffer(options['batch_size'], flush_interval=3600, spool_dir=spool_dir)
+
+            def buffered(count):
+                for _ in range(count):
+                    fields = entry()
+                    buffer.record(fields.pop('kind'), **fields)
+                connection.close()
+
+            for label, worker in (('synchronous', synchronous), ('buffered', buffered)):
+                with timed(results, label):
+                    with ThreadPoolExecutor(threads) as pool:
+                        list(pool.map(worker, [events // threads] * threads))
+                    buffer.flush()
+
+            written = ActivityEvent.objects.count()
+
+        self.stdout.write(f"{events} events, {threads} thread(s), batch size {options['batch_size']}")
+        self.stdout.write(f"{'mode':<12} {'wall s':>8} {'cpu s':>8} {'events/s':>10}")
+        for label, (cpu, wall) in results.items():
+            self.stdout.write(f"{label:<12} {wall:>8.2f} {cpu:>8.2f} {events / wall:>10.0f}")
+        speedup = results['synchronous'][1] / results['buffered'][1]
+        self.stdout.write(self.style.SUCCESS(f"Buffered ingestion is {speedup:.1f}x faster ({written} rows written)."))
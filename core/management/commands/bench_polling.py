@@ -0,0 +1,214 @@
+# core/management/commands/bench_polling.py
+
+"""
+Side-by-side: the polling views as they ship (sync, on a WSGI thread pool)
+vs. async twins of them under the ASGI handler, for a burst of concurrent
+status pollers.
+
+The async twins below use the async ORM and cache but otherwise do what
+queue_page and api.order_status do, with the same per-branch queue cache and
+page logic from core/order_queue.py. So the only difference measured is how
+requests are served. Latency is counted from the start of the burst, i.e. it
+includes time spent waiting for a free worker thread.
+"""
+
+import asyncio
+import io
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.shortcuts import render
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from core.api import ACTIVE_ORDER_STATUSES, _error, _etagged_json
+from core.models import Branch, Medicine, Order, OrderItem
+from core.order_queue import abranch_queue, position_in, queue_page_context
+from ._bench import bench_database
+
+
+async def _auser(request):
+    # Pin the user so templates and context processors don't look it up synchronously.
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+@login_required
+async def async_queue_page(request):
+    user = await _auser(request)
+    current_order = await (Order.objects.filter(user=user, status__in=['Processing', 'Shipped'])
+                           .prefetch_related('items__medicine').alast())
+    context = {'current_order': current_order}
+    if current_order is not None:
+        queue = await abranch_queue(current_order.branch_id) if current_order.branch_id else []
+        context.update(queue_page_context(current_order, queue))
+    return render(request, 'core/queue_page.html', context)
+
+
+async def async_order_status(request):
+    user = await _auser(request)
+    if not user.is_authenticated:
+        return _error("Authentication required.", status=401)
+
+    orders = [
+        o async for o in Order.objects.filter(user=user, status__in=ACTIVE_ORDER_STATUSES)
+        .order_by('-order_date')
+        .annotate(item_count=Count('items'))
+        .values('id', 'status', 'total_price', 'order_date', 'branch_id', 'branch__name', 'item_count')
+    ]
+    positions = {}
+    for o in orders:
+        if o['status'] == 'Processing' and o['branch_id']:
+            positions[o['id']] = position_in(await abranch_queue(o['branch_id']), o['id'])
+
+    return _etagged_json(request, {
+        'orders': [
+            {
+                'id': o['id'],
+                'status': o['status'],
+                'total': o['total_price'],
+                'items': o['item_count'],
+                'branch': o['branch__name'],
+                'queue_position': positions.get(o['id']),
+            }
+            for o in orders
+        ],
+    }, private=True)
+
+
+# Mounted with override_settings(ROOT_URLCONF=__name__) for the duration of the run.
+urlpatterns = [
+    path('async/queue/', async_queue_page),
+    path('async/status/', async_order_status),
+    path('', include('MediServe.urls')),
+]
+
+ENDPOINTS = {
+    'status': ('/api/orders/status/', '/async/status/'),
+    'queue': ('/queue/', '/async/queue/'),
+}
+
+
+class Command(BaseCommand):
+    help = "Compares the sync polling views on a WSGI thread pool with async twins under ASGI for concurrent pollers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pollers', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=200, help="Distinct residents the pollers are spread over.")
+        parser.add_argument('--threads', type=int, default=8, help="WSGI worker threads (e.g. gunicorn --threads).")
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='status')
+
+    def handle(self, *args, **options):
+        pollers = options['pollers']
+        sync_url, async_url = ENDPOINTS[options['endpoint']]
+        results = {}
+        with bench_database(), override_settings(ROOT_URLCONF=__name__):
+            sessions = self.populate(options['users'])
+            cookies = [sessions[i % len(sessions)] for i in range(pollers)]
+
+            cache.clear()
+            results['wsgi sync'] = self.run_wsgi(sync_url, cookies, options['threads'])
+            cache.clear()
+            # The shipped views as uvicorn would run them: each one on the sync thread.
+            results['asgi sync'] = asyncio.run(self.run_asgi(sync_url, cookies))
+            cache.clear()
+            results['asgi async'] = asyncio.run(self.run_asgi(async_url, cookies))
+
+        self.stdout.write(f"{pollers} concurrent pollers on {sync_url}, {options['users']} residents, "
+                          f"{options['threads']} WSGI threads")
+        self.stdout.write(f"{'server':<11} {'wall s':>7} {'req/s':>7} {'p50 ms':>7} {'p95 ms':>7} "
+                          f"{'max ms':>7} {'threads':>7} {'errors':>6}")
+        for label, (wall, latencies, threads, errors) in results.items():
+            ordered = sorted(latencies)
+            p95 = ordered[int(len(ordered) * 0.95) - 1]
+            self.stdout.write(
+                f"{label:<11} {wall:>7.2f} {pollers / wall:>7.0f} {statistics.median(ordered) * 1000:>7.0f} "
+                f"{p95 * 1000:>7.0f} {ordered[-1] * 1000:>7.0f} {threads:>7} {errors:>6}"
+            )
+        self.stdout.write("threads = peak threads alive in the process while serving the burst.")
+
+    def populate(self, count):
+        """One Processing order with three items per resident; returns their session keys."""
+        branch = Branch.get_default()
+        medicines = [Medicine.objects.create(name=f'Medicine {i}', dosage='500mg', formulation='Tablet',
+                                             price=Decimal('12.50')) for i in range(3)]
+        sessions = []
+        for i in range(count):
+            user = User.objects.create_user(username=f'resident{i}')
+            order = Order.objects.create(user=user, branch=branch, status='Processing', total_price=Decimal('75.00'))
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, medicine=m, quantity=2, unit_price=m.price) for m in medicines
+            ])
+            # A fresh client each time: logging in on a used one flushes the previous session.
+            client = Client()
+            client.force_login(user)
+            sessions.append(client.cookies[settings.SESSION_COOKIE_NAME].value)
+        return sessions
+
+    def run_wsgi(self, url, cookies, threads):
+        handler = WSGIHandler()
+        peak = [threading.active_count()]
+        start = time.perf_counter()
+
+        def poll(session_key):
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': url, 'QUERY_STRING': '', 'SERVER_NAME': 'testserver',
+                'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1', 'REMOTE_ADDR': '127.0.0.1',
+                'HTTP_COOKIE': f"{settings.SESSION_COOKIE_NAME}={session_key}",
+                'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+            }
+            status = []
+            response = handler(environ, lambda code, headers: status.append(code))
+            b''.join(response)
+            response.close()
+            peak[0] = max(peak[0], threading.active_count())
+            return time.perf_counter() - start, not status[0].startswith('200')
+
+        with ThreadPoolExecutor(threads) as pool:
+            outcomes = list(pool.map(poll, cookies))
+        wall = time.perf_counter() - start
+        return wall, [latency for latency, _ in outcomes], peak[0], sum(error for _, error in outcomes)
+
+    async def run_asgi(self, url, cookies):
+        handler = ASGIHandler()
+        peak = [threading.active_count()]
+        start = time.perf_counter()
+
+        async def poll(session_key):
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': url, 'raw_path': url.encode(), 'query_string': b'',
+                'headers': [(b'host', b'testserver'),
+                            (b'cookie', f"{settings.SESSION_COOKIE_NAME}={session_key}".encode())],
+                'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+            }
+            inbox = asyncio.Queue()
+            inbox.put_nowait({'type': 'http.request', 'body': b'', 'more_body': False})
+            status = []
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            # After the body the handler waits for a disconnect that never comes.
+            await handler(scope, inbox.get, send)
+            peak[0] = max(peak[0], threading.active_count())
+            return time.perf_counter() - start, status[0] != 200
+
+        outcomes = await asyncio.gather(*(poll(key) for key in cookies))
+        wall = time.perf_counter() - start
+        return wall, [latency for latency, _ in outcomes], peak[0], sum(error for _, error in outcomes)
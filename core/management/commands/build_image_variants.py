@@ -0,0 +1,43 @@
+# core/management/commands/build_image_variants.py
+
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Builds resized WebP/PNG variants of the images listed in settings.IMAGE_VARIANTS."
+
+    def handle(self, *args, **options):
+        try:
+            from PIL import Image
+        except ImportError:
+            raise CommandError("Pillow is required to build image variants: pip install Pillow")
+
+        for source_name, (prefix, widths) in settings.IMAGE_VARIANTS.items():
+            source = finders.find(source_name)
+            if not source:
+                raise CommandError(f"Static image not found: {source_name}")
+            # Variants are written next to the source so collectstatic picks them up.
+            out_dir = Path(source).parent / 'variants'
+            out_dir.mkdir(exist_ok=True)
+
+            with Image.open(source) as image:
+                original = Path(source).stat().st_size
+                for width in widths:
+                    height = round(image.height * width / image.width)
+                    resized = image.resize((width, height), Image.LANCZOS) if width < image.width else image.copy()
+                    # Our icons/logos survive a 256 colour palette, and lossless output of the
+                    # palette image is smaller than lossy WebP at these sizes.
+                    palette = resized.quantize(256, method=Image.Quantize.FASTOCTREE)
+                    for ext, variant, save_options in (
+                        ('webp', palette, {'lossless': True, 'method': 6}),
+                        ('png', palette, {'optimize': True}),
+                    ):
+                        target = out_dir / f"{prefix}-{width}.{ext}"
+                        variant.save(target, **save_options)
+                        self.stdout.write(
+                            f"{source_name} -> {target.name}: {original} -> {target.stat().st_size} bytes"
+                        )
@@ -0,0 +1,128 @@
+# core/management/commands/dbmaintain.py
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from core import maintenance
+
+
+def _size(num_bytes):
+    if num_bytes is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(num_bytes) < 1024 or unit == 'GB':
+            return f"{num_bytes:.0f} {unit}" if unit == 'B' else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+
+
+class Command(BaseCommand):
+    help = ("Routine SQLite upkeep: quick integrity check, batched expired-session purge, time-boxed "
+            "incremental vacuum, ANALYZE/PRAGMA optimize, then a size and growth report. Run it from cron.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--report-only', action='store_true', help="Only check and report; change nothing (not even the history file).")
+        parser.add_argument('--skip-sessions', action='store_true')
+        parser.add_argument('--skip-vacuum', action='store_true')
+        parser.add_argument('--skip-analyze', action='store_true')
+        parser.add_argument('--full-analyze', action='store_true', help="ANALYZE everything instead of PRAGMA optimize.")
+        parser.add_argument('--vacuum-budget', type=float, help="Seconds the incremental vacuum may run.")
+        parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                            help="One-off: switch the file to auto_vacuum=INCREMENTAL (runs a full VACUUM).")
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'sqlite':
+            raise CommandError(f"dbmaintain only supports SQLite; '{using}' is {connections[using].vendor}.")
+        config = maintenance.get_config()
+
+        # Don't write to a damaged file; cron mails the non-zero exit.
+        problems = maintenance.quick_check(using)
+        if problems:
+            raise CommandError("Integrity check failed:\n" + '\n'.join(problems))
+        self.stdout.write("Integrity (quick_check): ok")
+
+        if not options['report_only']:
+            self.maintain(using, config, options)
+        self.report(using, config, record=not options['report_only'])
+
+    def maintain(self, using, config, options):
+        if options['enable_incremental_vacuum']:
+            maintenance.enable_incremental_vacuum(using)
+            self.stdout.write("auto_vacuum switched to incremental (full VACUUM done).")
+
+        if not options['skip_sessions']:
+            deleted = maintenance.purge_expired_sessions(config['SESSION_BATCH_SIZE'])
+            self.stdout.write(f"Expired sessions purged: {deleted}")
+
+        if not options['skip_vacuum']:
+            mode = maintenance.auto_vacuum_mode(using)
+            if mode == 'incremental':
+                budget = options['vacuum_budget'] if options['vacuum_budget'] is not None \
+                    else config['VACUUM_TIME_BUDGET']
+                released, still_free = maintenance.incremental_vacuum(
+                    budget, config['VACUUM_PAGES_PER_SLICE'], using)
+                self.stdout.write(f"Incremental vacuum: {released} pages released, {still_free} still free")
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f"Incremental vacuum skipped: auto_vacuum is '{mode}'. "
+                    "Run once with --enable-incremental-vacuum during a quiet hour."))
+
+        if not options['skip_analyze']:
+            ran = maintenance.optimize(config['ANALYSIS_LIMIT'], full=options['full_analyze'], using=using)
+            self.stdout.write(f"Statistics refreshed: {ran}")
+
+    def report(self, using, config, record=True):
+        tables = maintenance.table_report(using)
+        stats = maintenance.file_stats(using)
+
+        self.stdout.write('')
+        self.stdout.write(f"{'table / index':<44} {'rows':>9} {'size':>10} {'rows/key':>9}")
+        self.stdout.write('-' * 75)
+        for table in sorted(tables, key=lambda t: (-(t['bytes'] or 0), t['name'])):
+            self.stdout.write(f"{table['name']:<44} {table['rows']:>9} {_size(table['bytes']):>10}")
+            for index in table['indexes']:
+                rows_per_key = index['rows_per_key'] if index['rows_per_key'] is not None else '-'
+                self.stdout.write(f"  {index['name']:<42} {'':>9} {_size(index['bytes']):>10} {rows_per_key:>9}")
+        self.stdout.write('-' * 75)
+        self.stdout.write(f"File: {_size(stats['file_bytes'])} (WAL {_size(stats['wal_bytes'])}), "
+                          f"free pages: {_size(stats['free_bytes'])}")
+
+        if config['HISTORY_FILE']:
+            snapshot = {
+                'at': timezone.now().isoformat(),
+                'file_bytes': stats['file_bytes'],
+                'free_bytes': stats['free_bytes'],
+                'rows': {table['name']: table['rows'] for table in tables},
+            }
+            # --report-only compares against the history but doesn't add to it.
+            if record:
+                previous = maintenance.record_history(config['HISTORY_FILE'], snapshot)
+            else:
+                previous = maintenance.last_snapshot(config['HISTORY_FILE'])
+            if previous:
+                self.report_growth(previous, snapshot)
+
+        if stats['file_bytes'] > config['WARN_FILE_BYTES']:
+            self.stdout.write(self.style.WARNING(
+                f"The database file is over {_size(config['WARN_FILE_BYTES'])}; consider moving off "
+                "single-file SQLite (e.g. to PostgreSQL) before write contention hurts checkouts."))
+
+    def report_growth(self, previous, current):
+        days = (datetime.fromisoformat(current['at'])
+                - datetime.fromisoformat(previous['at'])).total_seconds() / 86400
+        growth = current['file_bytes'] - previous['file_bytes']
+        line = f"Growth since {previous['at'][:16]}: {'+' if growth >= 0 else '-'}{_size(abs(growth))}"
+        if days >= 1:
+            line += f" ({_size(growth / days)}/day)"
+        self.stdout.write(line)
+        busiest = sorted(
+            ((rows - previous['rows'].get(name, 0), name) for name, rows in current['rows'].items()),
+            reverse=True,
+        )[:3]
+        if busiest and busiest[0][0] > 0:
+            self.stdout.write("Fastest-growing tables: " + ', '.join(
+                f"{name} (+{delta} rows)" for delta, name in busiest if delta > 0))
@@ -0,0 +1,13 @@
+# core/management/commands/flush_ingest.py
+
+from django.core.management.base import BaseCommand
+
+from core.ingest import get_buffer
+
+
+class Command(BaseCommand):
+    help = "Writes feedback/activity entries left in the ingest spool by stopped or crashed workers."
+
+    def handle(self, *args, **options):
+        replayed = get_buffer().replay_spool()
+        self.stdout.write(self.style.SUCCESS(f"Replayed {replayed} spooled entries."))
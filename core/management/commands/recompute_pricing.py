@@ -0,0 +1,36 @@
+# core/management/commands/recompute_pricing.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Order
+from core.pricing import reprice_orders
+
+STATUSES = [status for status, _ in Order.STATUS_CHOICES]
+
+
+class Command(BaseCommand):
+    help = ("Re-prices order lines and totals with the current senior/PWD rules (PRICING setting). "
+            "Defaults to open carts; placed orders keep the price the resident was quoted.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', action='append', choices=STATUSES,
+                            help="Order status to re-price (repeatable). Default: Pending.")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        statuses = options['status'] or ['Pending']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        order_ids = list(Order.objects.filter(status__in=statuses).order_by('pk').values_list('pk', flat=True))
+        changed, delta = 0, 0
+        for start in range(0, len(order_ids), batch_size):
+            batch = Order.objects.filter(pk__in=order_ids[start:start + batch_size]).prefetch_related('items')
+            batch_changed, batch_delta = reprice_orders(batch)
+            changed += batch_changed
+            delta += batch_delta
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-priced {len(order_ids)} {'/'.join(statuses)} order(s): {changed} changed, "
+            f"amount payable {'+' if delta >= 0 else '-'}₱{abs(delta):.2f}."))
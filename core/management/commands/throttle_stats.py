@@ -0,0 +1,28 @@
+# core/management/commands/throttle_stats.py
+
+from django.core.management.base import BaseCommand
+
+from core import throttle
+
+
+class Command(BaseCommand):
+    help = "Shows how many login/signup attempts each throttle bucket has rejected."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Zero the counters after printing them.")
+
+    def handle(self, *args, **options):
+        config = throttle.get_config()
+        self.stdout.write(f"Throttling {'enabled' if config['ENABLED'] else 'DISABLED'}, "
+                          f"buckets in cache '{config['CACHE_ALIAS']}', "
+                          f"counters in '{config['STATS_CACHE_ALIAS'] or config['CACHE_ALIAS']}'")
+        self.stdout.write(f"{'scope':<8} {'bucket':<10} {'limit':<14} {'rejected':>9}")
+        if throttle.is_process_local():
+            self.stdout.write(self.style.WARNING(
+                "The counter cache is process-local; these are this process's counts, not the web workers'."))
+        for (scope, kind), rejected in throttle.rejection_counts().items():
+            capacity, period = config['RULES'][scope][kind]
+            self.stdout.write(f"{scope:<8} {kind:<10} {f'{capacity} per {period}s':<14} {rejected:>9}")
+        if options['reset']:
+            throttle.reset_counts()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
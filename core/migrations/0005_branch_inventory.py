@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+DEFAULT_BRANCH_NAME = 'Main Health Center'
+
+
+def move_stock_to_default_branch(apps, schema_editor):
+    Branch = apps.get_model('core', 'Branch')
+    BranchStock = apps.get_model('core', 'BranchStock')
+    Medicine = apps.get_model('core', 'Medicine')
+    Order = apps.get_model('core', 'Order')
+
+    branch, _ = Branch.objects.get_or_create(name=DEFAULT_BRANCH_NAME, defaults={'is_default': True})
+    BranchStock.objects.bulk_create(
+        BranchStock(branch=branch, medicine_id=pk, quantity=quantity)
+        for pk, quantity in Medicine.objects.values_list('pk', 'stock_quantity')
+    )
+    # Existing orders were all filled from the single shared stock
+    Order.objects.filter(branch__isnull=True).update(branch=branch)
+
+
+def move_stock_back_to_medicine(apps, schema_editor):
+    BranchStock = apps.get_model('core', 'BranchStock')
+    Medicine = apps.get_model('core', 'Medicine')
+
+    totals = {}
+    for medicine_id, quantity in BranchStock.objects.values_list('medicine_id', 'quantity'):
+        totals[medicine_id] = totals.get(medicine_id, 0) + quantity
+    for medicine_id, total in totals.items():
+        Medicine.objects.filter(pk=medicine_id).update(stock_quantity=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_feedback_activityevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Branch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('address', models.CharField(blank=True, max_length=255)),
+                ('is_default', models.BooleanField(default=False)),
+            ],
+            options={
+                'verbose_name_plural': 'Branches',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='branch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='core.branch'),
+        ),
+        migrations.CreateModel(
+            name='BranchStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(default=0)),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stocks', to='core.branch')),
+                ('medicine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='branch_stocks', to='core.medicine')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('branch', 'medicine'), name='unique_branch_medicine_stock')],
+            },
+        ),
+        migrations.RunPython(move_stock_to_default_branch, move_stock_back_to_medicine),
+        migrations.RemoveField(
+            model_name='medicine',
+            name='stock_quantity',
+        ),
+    ]
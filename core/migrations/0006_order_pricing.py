@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 20:23
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_list_prices(apps, schema_editor):
+    # Existing lines were charged list price; `manage.py recompute_pricing`
+    # applies senior/PWD discounts to the carts that are still open.
+    OrderItem = apps.get_model('core', 'OrderItem')
+    Order = apps.get_model('core', 'Order')
+    OrderItem.objects.update(subtotal=F('quantity') * F('unit_price'), line_total=F('quantity') * F('unit_price'))
+    Order.objects.update(subtotal=F('total_price'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_branch_inventory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='discount',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='discount_type',
+            field=models.CharField(blank=True, choices=[('', 'None'), ('senior', 'Senior Citizen'), ('pwd', 'PWD')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='vat_exemption',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='discount',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='line_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='vat_exemption',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
+        ),
+        migrations.RunPython(backfill_list_prices, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,9 @@
 # core/models.py
 
 from django.db import models  # <-- MANDATORY FIX for NameError
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class UserProfile(models.Model):
@@ -25,22 +27,76 @@ class UserProfile(models.Model):
 
 # --- NEW MEDICINE AND ORDER MODELS ---
 
+class MedicineQuerySet(models.QuerySet):
+    def with_stock(self):
+        """Annotate total_stock summed across all branches (one grouped query)."""
+        return self.annotate(total_stock=Coalesce(models.Sum('branch_stocks__quantity'), 0))
+
+
 class Medicine(models.Model):
     name = models.CharField(max_length=200)
     generic_name = models.CharField(max_length=200, blank=True, null=True)
     dosage = models.CharField(max_length=50)  # e.g., '500mg', '10ml'
     formulation = models.CharField(max_length=50)  # e.g., 'Tablet', 'Capsule', 'Syrup'
     price = models.DecimalField(max_digits=10, decimal_places=2)
-    stock_quantity = models.IntegerField(default=0)
     description = models.TextField(blank=True, null=True)
 
+    objects = MedicineQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} ({self.dosage})"
 
+    # Stock now lives per branch (BranchStock). Querysets built with
+    # with_stock() fill this in; otherwise it costs one aggregate query.
+    @property
+    def stock_quantity(self):
+        if not hasattr(self, 'total_stock'):
+            self.total_stock = self.branch_stocks.aggregate(
+                total=Coalesce(models.Sum('quantity'), 0)
+            )['total']
+        return self.total_stock
+
+    @stock_quantity.setter
+    def stock_quantity(self, value):
+        # Used to be a column; refuse rather than silently drop the stock.
+        raise AttributeError("Medicine.stock_quantity is read-only; stock is kept per branch in BranchStock.")
+
     class Meta:
         verbose_name_plural = "Medicines"
 
 
+class Branch(models.Model):
+    # A barangay health station holding its own stock
+    name = models.CharField(max_length=100, unique=True)
+    address = models.CharField(max_length=255, blank=True)
+    is_default = models.BooleanField(default=False)
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def get_default(cls):
+        return cls.objects.filter(is_default=True).first() or cls.objects.order_by('pk').first()
+
+    class Meta:
+        verbose_name_plural = "Branches"
+        ordering = ['name']
+
+
+class BranchStock(models.Model):
+    branch = models.ForeignKey(Branch, related_name='stocks', on_delete=models.CASCADE)
+    medicine = models.ForeignKey(Medicine, related_name='branch_stocks', on_delete=models.CASCADE)
+    quantity = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.medicine.name} @ {self.branch.name}: {self.quantity}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['branch', 'medicine'], name='unique_branch_medicine_stock'),
+        ]
+
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('Pending', 'Pending'),
@@ -50,9 +106,22 @@ class Order(models.Model):
         ('Cancelled', 'Cancelled'),
     ]
 
+    DISCOUNT_CHOICES = [
+        ('', 'None'),
+        ('senior', 'Senior Citizen'),
+        ('pwd', 'PWD'),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Branch the order is picked up from; stock is deducted only there
+    branch = models.ForeignKey(Branch, on_delete=models.PROTECT, blank=True, null=True)
     order_date = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
+    # Sums of the line breakdowns (see core/pricing.py); total_price is what the resident pays
+    discount_type = models.CharField(max_length=10, choices=DISCOUNT_CHOICES, blank=True, default='')
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    vat_exemption = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    discount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
 
     def __str__(self):
@@ -65,6 +134,87 @@ class OrderItem(models.Model):
     quantity = models.PositiveIntegerField()
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     special_request = models.TextField(blank=True, null=True)
+    # Priced once when the line changes (core/pricing.py), never per render
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    vat_exemption = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    discount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    line_total = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+
+    def __str__(self):
+        return f"{self.quantity} x {self.medicine.name}"
+
+
+# --- ANNOUNCEMENTS (11) ---
+
+class AnnouncementQuerySet(models.QuerySet):
+    def live(self, now=None):
+        """Announcements that are published and not yet expired."""
+        now = now or timezone.now()
+        return self.filter(publish_at__lte=now).filter(
+            models.Q(expires_at__isnull=True) | models.Q(expires_at__gt=now)
+        )
+
+
+class Announcement(models.Model):
+    title = models.CharField(max_length=200)
+    content = models.TextField()
+    author = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
+    is_pinned = models.BooleanField(default=False)
+    publish_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = AnnouncementQuerySet.as_manager()
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        verbose_name_plural = "Announcements"
+        # Pinned posts first, then newest
+        ordering = ['-is_pinned', '-publish_at']
+        indexes = [models.Index(fields=['publish_at', 'expires_at'])]
+
+
+# --- FEEDBACK AND ACTIVITY EVENTS (14) ---
+# Rows are written in batches by core/ingest.py, so created_at is the capture
+# time passed in by the buffer, not the time of the INSERT.
+
+class Feedback(models.Model):
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
+    subject = models.CharField(max_length=200)
+    details = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
-        return f"{self.quantity} x {self.medicine.name}"
\ No newline at end of file
+        return self.subject
+
+    class Meta:
+        verbose_name_plural = "Feedback"
+        indexes = [models.Index(fields=['created_at'])]
+
+
+class ActivityEvent(models.Model):
+    EVENT_CHOICES = [
+        ('catalog_view', 'Catalog View'),
+        ('medicine_view', 'Medicine View'),
+        ('cart_add', 'Cart Add'),
+        ('cart_remove', 'Cart Remove'),
+    ]
+
+    event_type = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True)
+    medicine = models.ForeignKey(Medicine, on_delete=models.SET_NULL, blank=True, null=True)
+    quantity = models.IntegerField(blank=True, null=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.event_type} at {self.created_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        indexes = [
+            # Demand-planning reports: events of a type over a period, per medicine
+            models.Index(fields=['event_type', 'created_at']),
+            models.Index(fields=['medicine', 'event_type', 'created_at']),
+        ]
@@ -0,0 +1,89 @@
+# core/order_queue.py
+
+"""
+Per-branch queue of orders being prepared, shared by every status poller.
+
+The queue page, the delivery page and /api/orders/status/ are polled every few
+seconds by each waiting resident. They all need the same thing - the ids of
+the branch's Processing orders, oldest first - so it is read once into the
+cache and every poller at that branch reuses it until an order is written
+(see core/signals.py) or QUEUE_TTL passes.
+
+The polling views are plain sync views: each poll is a short request, and
+``manage.py bench_polling`` shows them serving pollers faster on a WSGI
+thread pool than async twins do under ASGI. abranch_queue() is kept for
+those twins.
+"""
+
+from django.core.cache import cache
+
+from .models import Order
+
+# Order saves only clear this worker's copy; with per-process caches another
+# worker's pollers may see their position lag by up to this many seconds.
+QUEUE_TTL = 10
+MINUTES_PER_ORDER = 5
+
+
+def _queue_key(branch_id):
+    return f"queue:branch:{branch_id}"
+
+
+def invalidate_queue(branch_id):
+    cache.delete(_queue_key(branch_id))
+
+
+def _queue_ids(branch_id):
+    return (Order.objects.filter(branch_id=branch_id, status='Processing')
+            .order_by('order_date', 'pk').values_list('pk', flat=True))
+
+
+def branch_queue(branch_id):
+    """Return the ids of ``branch_id``'s Processing orders, oldest first, cached."""
+    key = _queue_key(branch_id)
+    queue = cache.get(key)
+    if queue is None:
+        queue = list(_queue_ids(branch_id))
+        cache.set(key, queue, QUEUE_TTL)
+    return queue
+
+
+async def abranch_queue(branch_id):
+    """Async twin of branch_queue() (same key, same TTL)."""
+    key = _queue_key(branch_id)
+    queue = await cache.aget(key)
+    if queue is None:
+        queue = [pk async for pk in _queue_ids(branch_id)]
+        await cache.aset(key, queue, QUEUE_TTL)
+    return queue
+
+
+def position_in(queue, order_id):
+    """1-based position of an order in a branch queue, or None."""
+    try:
+        return queue.index(order_id) + 1
+    except ValueError:
+        return None
+
+
+def queue_position(order_id, branch_id):
+    """1-based position of a Processing order in its branch queue, or None."""
+    return position_in(branch_queue(branch_id), order_id)
+
+
+def estimated_wait(position):
+    # Same "15-20 minutes" shape the queue page always showed.
+    ahead = position - 1
+    return f"{ahead * MINUTES_PER_ORDER}-{(ahead + 1) * MINUTES_PER_ORDER} minutes"
+
+
+def queue_page_context(order, queue):
+    """Ticket, now-serving and wait figures for the queue page, from the order's branch queue."""
+    # The order number doubles as the queue ticket.
+    context = {'current_number': order.id, 'currently_serving': queue[0] if queue else None}
+    position = position_in(queue, order.id)
+    if order.status == 'Shipped':
+        context['estimated_wait'] = "Out for delivery"
+    elif position is not None:
+        context['estimated_wait'] = estimated_wait(position)
+    return context
@@ -0,0 +1,169 @@
+# core/pricing.py
+
+"""
+Senior citizen / PWD pricing, worked out once per cart line.
+
+Eligible residents pay for medicine without VAT and get the statutory
+discount on the VAT-exempt amount (RA 9994 / RA 10754: 20% off, VAT exempt,
+no stacking of the two discounts). The breakdown is stored on each OrderItem
+and summed onto its Order when the line is added or removed, so the cart,
+checkout and analytics pages only read stored columns.
+
+Eligibility comes from UserProfile.is_senior / is_pwd and is cached per user
+for ELIGIBILITY_TTL; core/signals.py drops the cached record on profile saves
+and re-prices the open cart when it was priced for a different status. After
+changing the rules below, run ``manage.py recompute_pricing`` to re-price open
+carts.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import Order, OrderItem, UserProfile
+
+DEFAULTS = {
+    'DISCOUNT_RATE': '0.20',
+    'VAT_RATE': '0.12',
+    # Shelf prices include VAT; eligible purchases are VAT-exempt.
+    'VAT_EXEMPT': True,
+    # Seconds a worker trusts its cached senior/PWD record. Profile saves only
+    # clear the saving worker's copy, so this is how long another worker may
+    # keep pricing new cart lines with the old status.
+    'ELIGIBILITY_TTL': 60,
+}
+
+CENT = Decimal('0.01')
+
+# OrderItem breakdown field -> Order field holding its sum
+TOTAL_FIELDS = {
+    'subtotal': 'subtotal',
+    'vat_exemption': 'vat_exemption',
+    'discount': 'discount',
+    'line_total': 'total_price',
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'PRICING', {}))
+    return config
+
+
+def _money(value):
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _eligibility_key(user_id):
+    return f"pricing:eligibility:{user_id}"
+
+
+def eligibility_for(is_senior, is_pwd):
+    # A resident who is both gets one discount, not two.
+    return 'senior' if is_senior else 'pwd' if is_pwd else ''
+
+
+def get_eligibility(user_id):
+    """Return 'senior', 'pwd' or '' for the user, cached."""
+    key = _eligibility_key(user_id)
+    eligibility = cache.get(key)
+    if eligibility is None:
+        flags = UserProfile.objects.filter(user_id=user_id).values_list('is_senior', 'is_pwd').first()
+        eligibility = eligibility_for(*(flags or (False, False)))
+        cache.set(key, eligibility, get_config()['ELIGIBILITY_TTL'])
+    return eligibility
+
+
+def invalidate_eligibility(user_id):
+    cache.delete(_eligibility_key(user_id))
+
+
+def price_line(unit_price, quantity, eligibility, config=None):
+    """Return the {subtotal, vat_exemption, discount, line_total} breakdown of one line."""
+    config = config or get_config()
+    subtotal = _money(Decimal(unit_price) * quantity)
+    vat_exemption = discount = Decimal('0.00')
+    if eligibility:
+        if config['VAT_EXEMPT']:
+            vat_exemption = _money(subtotal - subtotal / (1 + Decimal(config['VAT_RATE'])))
+        discount = _money((subtotal - vat_exemption) * Decimal(config['DISCOUNT_RATE']))
+    return {
+        'subtotal': subtotal,
+        'vat_exemption': vat_exemption,
+        'discount': discount,
+        'line_total': subtotal - vat_exemption - discount,
+    }
+
+
+def line_amounts(item):
+    """The breakdown currently stored on ``item`` (zeros for an unsaved line)."""
+    return {field: Decimal(getattr(item, field) or 0) for field in TOTAL_FIELDS}
+
+
+def apply_line(item, eligibility, config=None):
+    """Price ``item`` for its current quantity; returns True if anything changed."""
+    amounts = price_line(item.unit_price, item.quantity, eligibility, config)
+    changed = amounts != line_amounts(item)
+    for field, value in amounts.items():
+        setattr(item, field, value)
+    return changed
+
+
+def adjust_order_totals(order, before, after):
+    """
+    Move the order's stored totals by one line's change (``after - before``).
+
+    Uses F() like the rest of the cart code so two quick adds from different
+    tabs don't overwrite each other. Call order.save() afterwards.
+    """
+    for line_field, order_field in TOTAL_FIELDS.items():
+        delta = after[line_field] - before[line_field]
+        if delta:
+            setattr(order, order_field, F(order_field) + delta)
+
+
+def reprice_orders(orders, config=None):
+    """
+    Re-price every line of ``orders`` (prefetched with items) and rewrite the
+    stored totals. Returns (orders changed, change in amount payable).
+    """
+    config = config or get_config()
+    changed_orders, changed_items = [], []
+    delta = Decimal('0.00')
+    for order in orders:
+        eligibility = get_eligibility(order.user_id)
+        totals = dict.fromkeys(TOTAL_FIELDS, Decimal('0.00'))
+        for item in order.items.all():
+            if apply_line(item, eligibility, config):
+                changed_items.append(item)
+            for field in TOTAL_FIELDS:
+                totals[field] += getattr(item, field)
+        new_order_totals = {order_field: totals[line_field] for line_field, order_field in TOTAL_FIELDS.items()}
+        if order.discount_type != eligibility or any(
+                Decimal(getattr(order, field)) != value for field, value in new_order_totals.items()):
+            delta += new_order_totals['total_price'] - Decimal(order.total_price)
+            order.discount_type = eligibility
+            for field, value in new_order_totals.items():
+                setattr(order, field, value)
+            changed_orders.append(order)
+
+    if not (changed_orders or changed_items):
+        return 0, delta
+    with transaction.atomic():
+        OrderItem.objects.bulk_update(changed_items, list(TOTAL_FIELDS))
+        Order.objects.bulk_update(changed_orders, ['discount_type', *TOTAL_FIELDS.values()])
+    return len(changed_orders), delta
+
+
+def reprice_open_order(user_id, eligibility=None):
+    """
+    Re-price the user's Pending cart, e.g. after their senior/PWD status changed.
+    With ``eligibility``, carts already priced for it are left alone.
+    """
+    orders = Order.objects.filter(user_id=user_id, status='Pending')
+    if eligibility is not None:
+        orders = orders.exclude(discount_type=eligibility)
+    return reprice_orders(orders.prefetch_related('items'))
@@ -0,0 +1,44 @@
+# core/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .feeds import invalidate_feed
+from .models import Announcement, Order, UserProfile
+from .order_queue import invalidate_queue
+from .pricing import eligibility_for, invalidate_eligibility, reprice_open_order
+
+
+@receiver([post_save, post_delete], sender=Announcement)
+def announcement_changed(sender, **kwargs):
+    # Any write changes what the menus/feeds should show.
+    invalidate_feed()
+
+
+@receiver([post_save, post_delete], sender=Order)
+def order_changed(sender, instance, **kwargs):
+    # A status change moves every order behind this one in its branch queue.
+    # Wait for the commit so a poller cannot re-cache the queue as it was.
+    if instance.branch_id:
+        branch_id = instance.branch_id
+        transaction.on_commit(lambda: invalidate_queue(branch_id))
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def profile_changed(sender, instance, created=False, **kwargs):
+    # A brand-new profile has no cart to re-price.
+    if created:
+        return
+    user_id = instance.user_id
+    if kwargs['signal'] is post_delete:
+        eligibility = ''
+    else:
+        eligibility = eligibility_for(instance.is_senior, instance.is_pwd)
+
+    def refresh():
+        invalidate_eligibility(user_id)
+        # Name and birthday edits leave the cart's discount_type matching, so
+        # only a senior/PWD change actually re-prices anything.
+        reprice_open_order(user_id, eligibility)
+    transaction.on_commit(refresh)
@@ -1,3 +1,154 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .models import Medicine, Order, OrderItem, UserProfile
+from .pricing import price_line
+
+
+class PriceLineTests(SimpleTestCase):
+
+    def test_senior_line(self):
+        amounts = price_line(Decimal('112.00'), 1, 'senior')
+        self.assertEqual(amounts, {
+            'subtotal': Decimal('112.00'),
+            'vat_exemption': Decimal('12.00'),
+            'discount': Decimal('20.00'),
+            'line_total': Decimal('80.00'),
+        })
+
+    def test_pwd_gets_the_same_discount(self):
+        self.assertEqual(price_line(Decimal('112.00'), 1, 'pwd'), price_line(Decimal('112.00'), 1, 'senior'))
+
+    def test_not_eligible_pays_shelf_price(self):
+        amounts = price_line(Decimal('112.00'), 2, '')
+        self.assertEqual(amounts['vat_exemption'], Decimal('0.00'))
+        self.assertEqual(amounts['discount'], Decimal('0.00'))
+        self.assertEqual(amounts['line_total'], Decimal('224.00'))
+
+    def test_rounds_each_part_to_the_centavo(self):
+        amounts = price_line(Decimal('10.01'), 3, 'senior')
+        # 30.03 / 1.12 = 26.8125 -> 3.2175 VAT; 20% of 26.81 = 5.362
+        self.assertEqual(amounts['vat_exemption'], Decimal('3.22'))
+        self.assertEqual(amounts['discount'], Decimal('5.36'))
+        self.assertEqual(amounts['line_total'], Decimal('21.45'))
+
+
+# Cart views log activity events; write them inside the test transaction.
+@override_settings(INGEST={'BUFFERED': False})
+class PricingTestCase(TestCase):
+
+    def setUp(self):
+        # Eligibility is cached per user id, and ids repeat between tests.
+        cache.clear()
+        self.user = User.objects.create_user(username='resident', password='pw')
+        self.profile = UserProfile.objects.create(user=self.user, first_name='Juan', last_name='Dela Cruz',
+                                                  date_of_birth=datetime.date(1950, 1, 1), sex='Male')
+        self.paracetamol = Medicine.objects.create(name='Paracetamol', dosage='500mg', formulation='Tablet',
+                                                   price=Decimal('112.00'))
+        self.amoxicillin = Medicine.objects.create(name='Amoxicillin', dosage='250mg', formulation='Capsule',
+                                                   price=Decimal('56.00'))
+        self.client.force_login(self.user)
+
+    def set_flags(self, **flags):
+        for name, value in flags.items():
+            setattr(self.profile, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save()
+
+    def add(self, medicine, amount):
+        self.client.post(reverse('add_to_order', args=[medicine.pk]), {'amount': amount})
+
+    def cart(self):
+        return Order.objects.get(user=self.user, status='Pending')
+
+    def assertTotals(self, order, subtotal, vat_exemption, discount, total_price):
+        self.assertEqual(
+            (order.subtotal, order.vat_exemption, order.discount, order.total_price),
+            (Decimal(subtotal), Decimal(vat_exemption), Decimal(discount), Decimal(total_price)),
+        )
+
+
+class CartTotalsTests(PricingTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.set_flags(is_senior=True)
+
+    def test_lines_are_summed_onto_the_order(self):
+        self.add(self.paracetamol, 1)
+        self.add(self.amoxicillin, 2)
+        order = self.cart()
+        self.assertEqual(order.discount_type, 'senior')
+        self.assertTotals(order, '224.00', '24.00', '40.00', '160.00')
+
+    def test_adding_to_a_line_reprices_it(self):
+        self.add(self.paracetamol, 1)
+        self.add(self.paracetamol, 1)
+        item = OrderItem.objects.get()
+        self.assertEqual(item.quantity, 2)
+        self.assertEqual(item.line_total, Decimal('160.00'))
+        self.assertTotals(self.cart(), '224.00', '24.00', '40.00', '160.00')
+
+    def test_removing_a_line_subtracts_its_breakdown(self):
+        self.add(self.paracetamol, 1)
+        self.add(self.amoxicillin, 2)
+        line = OrderItem.objects.get(medicine=self.amoxicillin)
+        self.client.post(reverse('remove_order_item', args=[line.pk]))
+        self.assertTotals(self.cart(), '112.00', '12.00', '20.00', '80.00')
+
+    def test_removing_the_last_line_deletes_the_cart(self):
+        self.add(self.paracetamol, 1)
+        self.client.post(reverse('remove_order_item', args=[OrderItem.objects.get().pk]))
+        self.assertFalse(Order.objects.filter(user=self.user).exists())
+
+
+class ProfileRepriceTests(PricingTestCase):
+
+    def test_becoming_senior_reprices_the_pending_cart(self):
+        self.add(self.paracetamol, 1)
+        self.assertTotals(self.cart(), '112.00', '0.00', '0.00', '112.00')
+
+        self.set_flags(is_senior=True)
+
+        order = self.cart()
+        self.assertEqual(order.discount_type, 'senior')
+        self.assertTotals(order, '112.00', '12.00', '20.00', '80.00')
+        self.assertEqual(order.items.get().line_total, Decimal('80.00'))
+
+    def test_losing_status_returns_to_shelf_price(self):
+        self.set_flags(is_pwd=True)
+        self.add(self.paracetamol, 1)
+        self.set_flags(is_pwd=False)
+        order = self.cart()
+        self.assertEqual(order.discount_type, '')
+        self.assertTotals(order, '112.00', '0.00', '0.00', '112.00')
+
+    def test_placed_orders_keep_their_price(self):
+        self.add(self.paracetamol, 1)
+        Order.objects.update(status='Processing')
+        self.set_flags(is_senior=True)
+        self.assertEqual(Order.objects.get().total_price, Decimal('112.00'))
+
+    def test_name_edit_does_not_reprice(self):
+        self.add(self.paracetamol, 1)
+        # A stored total that re-pricing would overwrite
+        Order.objects.update(total_price=Decimal('1.00'))
+        self.profile.first_name = 'Juana'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.save()
+        self.assertEqual(self.cart().total_price, Decimal('1.00'))
+
+    def test_cart_priced_before_a_status_change_is_not_mixed(self):
+        self.add(self.paracetamol, 1)
+        # The flag changed without this worker's cache being told (another worker saved it).
+        UserProfile.objects.filter(pk=self.profile.pk).update(is_senior=True)
+        cache.clear()
+        self.add(self.amoxicillin, 1)
+        order = self.cart()
+        self.assertEqual(order.discount_type, 'senior')
+        self.assertTotals(order, '168.00', '18.00', '30.00', '120.00')
@@ -0,0 +1,168 @@
+# core/throttle.py
+
+"""
+Token-bucket throttling for the login and signup forms.
+
+Every POST to a throttled view takes one token from a per-IP bucket and (for
+login) a per-username bucket *before* the view runs, so a burst of bad logins
+or scripted signups is rejected without ever reaching the password hasher.
+
+Bucket state lives in a Django cache (``AUTH_THROTTLE['CACHE_ALIAS']``). The
+default local-memory cache only protects a single process; point the alias at
+a FileBasedCache/DatabaseCache/Redis cache to share buckets between workers.
+Rejections are counted per bucket kind in ``STATS_CACHE_ALIAS``; read them with
+``manage.py throttle_stats``. Keep that alias apart from the buckets: an
+attack creates one bucket per IP and username, and a cache that culls when
+full would throw the counters away exactly while they matter.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.shortcuts import render
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    # None = same cache as the buckets.
+    'STATS_CACHE_ALIAS': None,
+    # Only trust X-Forwarded-For when the app sits behind our own proxy.
+    'TRUST_X_FORWARDED_FOR': False,
+    # scope -> {key kind -> (capacity, refill period in seconds)}
+    'RULES': {
+        'login': {'ip': (20, 60), 'username': (5, 60)},
+        'signup': {'ip': (5, 600)},
+    },
+}
+
+# get/set on the cache is not atomic; the lock keeps threads of one worker from
+# double-spending a token. Across processes a token may occasionally be spent
+# twice, which is acceptable for abuse protection.
+_lock = threading.Lock()
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'AUTH_THROTTLE', {}))
+    return config
+
+
+def _cache():
+    return caches[get_config()['CACHE_ALIAS']]
+
+
+def _stats_cache():
+    config = get_config()
+    return caches[config['STATS_CACHE_ALIAS'] or config['CACHE_ALIAS']]
+
+
+def is_process_local():
+    """True when the rejection counters live in this process only (LocMemCache)."""
+    return isinstance(_stats_cache(), LocMemCache)
+
+
+def client_ip(request):
+    if get_config()['TRUST_X_FORWARDED_FOR']:
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _bucket_key(scope, kind, ident):
+    digest = hashlib.sha1(ident.encode('utf-8')).hexdigest()
+    return f"throttle:bucket:{scope}:{kind}:{digest}"
+
+
+def take_token(scope, kind, ident, capacity, period, now=None):
+    """Consume one token from the bucket; return False when it is empty."""
+    cache = _cache()
+    key = _bucket_key(scope, kind, ident)
+    now = time.time() if now is None else now
+    rate = capacity / period
+
+    with _lock:
+        tokens, updated = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # A bucket untouched for a full period is full again, so let it expire.
+        cache.set(key, (tokens, now), timeout=period)
+    return allowed
+
+
+def record_rejection(scope, kind):
+    cache = _stats_cache()
+    key = f"throttle:rejected:{scope}:{kind}"
+    # add() is a no-op when the counter exists; incr() then bumps it.
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def rejection_counts():
+    """Return {(scope, kind): rejected attempts} for every configured bucket."""
+    cache = _stats_cache()
+    counts = {}
+    for scope, rules in get_config()['RULES'].items():
+        for kind in rules:
+            counts[(scope, kind)] = cache.get(f"throttle:rejected:{scope}:{kind}", 0)
+    return counts
+
+
+def reset_counts():
+    """Zero the rejection counters (``throttle_stats --reset``)."""
+    cache = _stats_cache()
+    for scope, kind in rejection_counts():
+        cache.delete(f"throttle:rejected:{scope}:{kind}")
+
+
+def check_request(scope, request):
+    """Return the key kind that blocked this request, or None if it may proceed."""
+    config = get_config()
+    if not config['ENABLED']:
+        return None
+
+    identities = {
+        'ip': client_ip(request),
+        'username': request.POST.get('username', '').strip().lower(),
+    }
+    for kind, (capacity, period) in config['RULES'].get(scope, {}).items():
+        ident = identities.get(kind)
+        if not ident:
+            continue
+        if not take_token(scope, kind, ident, capacity, period):
+            record_rejection(scope, kind)
+            logger.warning("Throttled %s attempt (%s bucket) from %s", scope, kind, identities['ip'])
+            return kind
+    return None
+
+
+def throttle_auth(scope, template_name):
+    """
+    Reject POSTs over the ``scope`` budget with a 429 before the view runs.
+
+    Apply it outside ``transaction.atomic`` so a rejected attempt never opens a
+    transaction either.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method == 'POST' and check_request(scope, request):
+                messages.error(request, "Too many attempts. Please wait a minute and try again.")
+                return render(request, template_name, status=429)
+            return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
@@ -1,7 +1,7 @@
 # core/urls.py
 
 from django.urls import path
-from . import views
+from . import api, feeds, views
 
 urlpatterns = [
     # --- 1, 2, 3. Core Authentication and Navigation Pages ---
@@ -30,11 +30,18 @@ urlpatterns = [
     path('announcements/', views.announcements_view, name='announcements'),
     path('announcements/add/', views.add_post, name='add_post'),
     path('announcements/edit/<int:post_id>/', views.edit_post, name='edit_post'),
+    path('announcements/feed.json', feeds.announcements_json, name='announcements_json'),
+    path('announcements/feed.atom', feeds.announcements_atom, name='announcements_atom'),
 
     # --- 15, 16. Post-Order & Delivery Flow ---
     path('queue/', views.queue_page, name='queue_page'),
     path('delivery/', views.delivery_page, name='delivery_page'),
 
+    # --- JSON API for kiosk / SMS gateway / mobile clients ---
+    path('api/medicines/', api.medicine_catalog, name='api_medicine_catalog'),
+    path('api/medicines/<int:medicine_id>/stock/', api.medicine_stock, name='api_medicine_stock'),
+    path('api/orders/status/', api.order_status, name='api_order_status'),
+
     # --- 5, 17, 18, 19. Admin/Staff Views (FIXED TO MANAGEMENT/) ---
     path('management/menu/', views.admin_menu_view, name='admin_menu'),
     path('management/stock/', views.medicine_stock_view, name='medicine_stock'),
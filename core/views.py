@@ -6,12 +6,18 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import F  # FIX: Ensures F is imported
-from .models import UserProfile, Medicine, Order, OrderItem
-
-
-# NOTE: Placeholder models/forms for other features (Post, Feedback) are assumed or will be added later.
+from django.db.models import Count, F, Sum  # FIX: Ensures F is imported
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import UserProfile, Medicine, Order, OrderItem, Announcement, Branch, BranchStock
+from .feeds import recent_announcements
+from .ingest import record_event, record_feedback
+from .order_queue import branch_queue, queue_page_context
+from . import pricing
+from .throttle import throttle_auth
 
 
 # --- Core Authentication and Navigation Views (1, 2, 3, 4) ---
@@ -20,6 +26,7 @@ def splash_screen(request):
     return render(request, 'core/splash.html')
 
 
+@throttle_auth('login', 'core/login.html')
 def login_page(request):
     if request.method == 'POST':
         form = AuthenticationForm(request, data=request.POST)
@@ -44,6 +51,7 @@ def login_page(request):
     return render(request, 'core/login.html', {'form': form})
 
 
+@throttle_auth('signup', 'core/signup.html')
 @transaction.atomic
 def signup_page(request):
     if request.method == 'POST':
@@ -83,12 +91,12 @@ def main_menu(request):
     is_admin = request.user.is_superuser or (hasattr(request.user, 'userprofile') and request.user.userprofile.is_admin)
 
     if is_admin:
-        # Placeholder data for Admin Menu (5.6 Recent Brangay Announcement Preview)
-        context = {'recent_announcement': "New protocol for inventory check starting tomorrow."}
+        # (5.6) Recent Barangay Announcement Preview, served from the cached feed
+        context = {'recent_announcement': next(iter(recent_announcements(1)), None)}
         return render(request, 'core/admin_menu.html', context)  # (5.0)
     else:
-        # Placeholder data for User Menu (4.3 Recent Brangay Announcement Preview)
-        context = {'recent_announcement': "Vaccination drive scheduled this Friday."}
+        # (4.3) Recent Barangay Announcement Preview, served from the cached feed
+        context = {'recent_announcements': recent_announcements(2)}
         return render(request, 'core/main_menu.html', context)  # (4.0)
 
 
@@ -96,8 +104,9 @@ def main_menu(request):
 
 @login_required
 def medicine_list_view(request):
-    # (7.0)
-    medicines = Medicine.objects.all().order_by('name')
+    # (7.0) Availability is summed across branches in the same query
+    medicines = Medicine.objects.with_stock().order_by('name')
+    record_event('catalog_view', user=request.user)
     context = {'medicines': medicines}
     return render(request, 'core/medicine_list.html', context)
 
@@ -105,7 +114,8 @@ def medicine_list_view(request):
 @login_required
 def medicine_info_view(request, medicine_id):
     # (8.0)
-    medicine = get_object_or_404(Medicine, pk=medicine_id)
+    medicine = get_object_or_404(Medicine.objects.with_stock(), pk=medicine_id)
+    record_event('medicine_view', user=request.user, medicine=medicine)
     context = {'medicine': medicine}
     return render(request, 'core/medicine_info.html', context)
 
@@ -131,27 +141,29 @@ def add_to_order(request, medicine_id):
                 defaults={'quantity': 0, 'unit_price': medicine.price, 'special_request': special_request}
             )
 
-            # Recalculate old subtotal if updating
-            old_subtotal = order_item.quantity * order_item.unit_price
+            # Breakdown stored on the line before this change
+            old_amounts = pricing.line_amounts(order_item)
 
-            # Update quantity and calculate new subtotal
+            # Update quantity and price the line once (senior/PWD discount included)
             if not item_created:
                 order_item.quantity += quantity
                 order_item.special_request = special_request
             else:
                 order_item.quantity = quantity
 
+            eligibility = pricing.get_eligibility(request.user.pk)
+            pricing.apply_line(order_item, eligibility)
             order_item.save()
 
-            new_subtotal = order_item.quantity * order_item.unit_price
-
-            # Update Order Total safely using F()
-            if not item_created:
-                order.total_price = F('total_price') - old_subtotal + new_subtotal
-            else:
-                order.total_price = F('total_price') + new_subtotal
-
+            # Update Order totals safely using F()
+            pricing.adjust_order_totals(order, old_amounts, pricing.line_amounts(order_item))
+            priced_for = order.discount_type
+            order.discount_type = eligibility
             order.save()
+            if not created and priced_for != eligibility:
+                # Status changed since the earlier lines were priced; keep one rate per cart.
+                pricing.reprice_open_order(request.user.pk)
+            record_event('cart_add', user=request.user, medicine=medicine, quantity=quantity)
             messages.success(request, f"{quantity} x {medicine.name} added to your order.")
             return redirect('medicine_list')
         except Exception as e:
@@ -163,13 +175,12 @@ def add_to_order(request, medicine_id):
 @login_required
 def order_list_view(request):
     # (9.0)
-    try:
-        current_order = Order.objects.get(user=request.user, status='Pending')
+    current_order = Order.objects.filter(user=request.user, status='Pending').first()
+    if current_order is None:
+        context = {'order': None, 'items': [], 'total': 0.00}
+    else:
         order_items = current_order.items.select_related('medicine')
-        current_order.refresh_from_db()
         context = {'order': current_order, 'items': order_items, 'total': current_order.total_price}
-    except Order.DoesNotExist:
-        context = {'order': None, 'items': [], 'total': 0.00}
     return render(request, 'core/order_list.html', context)
 
 
@@ -180,12 +191,13 @@ def remove_order_item(request, item_id):
         order_item = get_object_or_404(OrderItem, pk=item_id)
         current_order = order_item.order
 
-        cost_to_remove = order_item.quantity * order_item.unit_price
-        current_order.total_price = F('total_price') - cost_to_remove
+        removed_amounts = pricing.line_amounts(order_item)
+        pricing.adjust_order_totals(current_order, removed_amounts, dict.fromkeys(removed_amounts, 0))
         current_order.save()
         current_order.refresh_from_db()
 
         item_name = order_item.medicine.name
+        record_event('cart_remove', user=request.user, medicine=order_item.medicine, quantity=order_item.quantity)
         order_item.delete()
 
         if current_order.items.count() == 0:
@@ -207,7 +219,12 @@ def order_checkout_view(request):
         if not items.exists():
             messages.error(request, "Your order is empty.")
             return redirect('order_list')
-        context = {'order': current_order, 'items': items}
+        context = {
+            'order': current_order,
+            'items': items,
+            'branches': Branch.objects.all(),
+            'selected_branch_id': current_order.branch_id or getattr(Branch.get_default(), 'pk', None),
+        }
         return render(request, 'core/order_confirmation.html', context)
     except Order.DoesNotExist:
         messages.error(request, "No pending order found to checkout.")
@@ -217,24 +234,42 @@ def order_checkout_view(request):
 @login_required
 @transaction.atomic
 def process_order(request):
-    # Final processing/stock deduction
+    # Final processing/stock deduction, only from the chosen branch's stock rows
     try:
         current_order = Order.objects.select_for_update().get(user=request.user, status='Pending')
-        items = current_order.items.select_related('medicine').all()
-
-        # 1. Stock Check
+        items = list(current_order.items.select_related('medicine'))
+
+        branch_id = request.POST.get('branch') or current_order.branch_id or getattr(Branch.get_default(), 'pk', None)
+        branch = Branch.objects.filter(pk=branch_id).first()
+        if branch is None:
+            messages.error(request, "Please choose a health center to pick up your order from.")
+            return redirect('order_checkout')
+
+        # 1. Stock Check (locks just this branch's rows for these medicines)
+        available = dict(
+            BranchStock.objects.select_for_update()
+            .filter(branch=branch, medicine_id__in=[item.medicine_id for item in items])
+            .values_list('medicine_id', 'quantity')
+        )
         for item in items:
-            item.medicine.refresh_from_db()
-            if item.quantity > item.medicine.stock_quantity:
+            if item.quantity > available.get(item.medicine_id, 0):
                 messages.error(request,
-                               f"Checkout failed. Insufficient stock ({item.medicine.stock_quantity} available) for {item.medicine.name}.")
+                               f"Checkout failed. Insufficient stock at {branch.name} "
+                               f"({available.get(item.medicine_id, 0)} available) for {item.medicine.name}.")
                 return redirect('order_list')
 
-        # 2. Update stock
+        # 2. Update stock; the quantity guard catches a concurrent checkout at the same branch
         for item in items:
-            Medicine.objects.filter(pk=item.medicine.pk).update(stock_quantity=F('stock_quantity') - item.quantity)
+            updated = BranchStock.objects.filter(
+                branch=branch, medicine_id=item.medicine_id, quantity__gte=item.quantity
+            ).update(quantity=F('quantity') - item.quantity)
+            if not updated:
+                transaction.set_rollback(True)
+                messages.error(request, f"Checkout failed. {item.medicine.name} just ran out at {branch.name}.")
+                return redirect('order_list')
 
         # 3. Change Order Status to 'Processing'
+        current_order.branch = branch
         current_order.status = 'Processing'
         current_order.save()
 
@@ -316,8 +351,14 @@ def settings_view(request):
 
 @login_required
 def feedback_view(request):
-    # (14.0) Placeholder for feedback form
+    # (14.0) Feedback form; stored through the write-behind buffer
     if request.method == 'POST':
+        subject = request.POST.get('subject', '').strip()
+        details = request.POST.get('details', '').strip()
+        if not subject or not details:
+            messages.error(request, "Please fill in both the subject and the details.")
+            return redirect('feedback')
+        record_feedback(request.user, subject[:200], details)
         messages.success(request, "Thank you for your feedback! It has been submitted.")
         return redirect('main_menu')
     return render(request, 'core/feedback.html')
@@ -325,13 +366,16 @@ def feedback_view(request):
 
 @login_required
 def queue_page(request):
-    # (15.0) Placeholder for real-time queue
-    current_order = Order.objects.filter(user=request.user, status__in=['Processing', 'Shipped']).last()
-    context = {
-        'current_number': 42,  # Mock data
-        'estimated_wait': "15-20 minutes",  # Mock data
-        'current_order': current_order
-    }
+    # (15.0) Polled every few seconds by everyone waiting in line.
+    current_order = (
+        Order.objects.filter(user=request.user, status__in=['Processing', 'Shipped'])
+        .prefetch_related('items__medicine')
+        .last()
+    )
+    context = {'current_order': current_order}
+    if current_order is not None:
+        queue = branch_queue(current_order.branch_id) if current_order.branch_id else []
+        context.update(queue_page_context(current_order, queue))
     return render(request, 'core/queue_page.html', context)
 
 
@@ -341,29 +385,53 @@ def delivery_page(request):
     is_admin = request.user.is_superuser or (hasattr(request.user, 'userprofile') and request.user.userprofile.is_admin)
     if is_admin:
         # (16.1) Admin View
-        processing_orders = Order.objects.filter(status='Processing').order_by('order_date')
+        processing_orders = Order.objects.filter(status='Processing').select_related('user').order_by('order_date')
         context = {'orders': processing_orders}
         return render(request, 'core/admin_delivery_view.html', context)
     else:
         # (16.2) User View
-        user_orders = Order.objects.filter(user=request.user, status__in=['Processing', 'Shipped']).order_by(
-            '-order_date')
+        user_orders = (Order.objects.filter(user=request.user, status__in=['Processing', 'Shipped'])
+                       .select_related('user').order_by('-order_date'))
         context = {'user_orders': user_orders}
         return render(request, 'core/user_delivery_view.html', context)
 
 
 # --- Announcement Views (11) ---
 
+ANNOUNCEMENTS_PER_PAGE = 10
+
+
+def _parse_post_datetime(value):
+    # <input type="datetime-local"> posts a naive 'YYYY-MM-DDTHH:MM' in local time
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Invalid date/time: {value}")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def _apply_post_form(post, data):
+    post.title = data['title']
+    post.content = data['content']
+    post.is_pinned = 'is_pinned' in data
+    post.publish_at = _parse_post_datetime(data.get('publish_at')) or post.publish_at or timezone.now()
+    post.expires_at = _parse_post_datetime(data.get('expires_at'))
+    if post.expires_at and post.expires_at <= post.publish_at:
+        raise ValueError("Expiry must be after the publish time.")
+
+
 @login_required
 def announcements_view(request):
-    # (11.0) Placeholder
+    # (11.0) Residents see live posts; admins also see scheduled and expired ones
     is_admin = request.user.is_superuser or (hasattr(request.user, 'userprofile') and request.user.userprofile.is_admin)
+    posts = Announcement.objects.all() if is_admin else Announcement.objects.live()
+    page_obj = Paginator(posts, ANNOUNCEMENTS_PER_PAGE).get_page(request.GET.get('page'))
     context = {
-        'announcements': [
-            {'title': 'New Store Hours', 'date': 'Oct 1', 'content': 'We are now open until 8 PM.'},
-            {'title': 'Flu Vaccine Drive', 'date': 'Sept 28', 'content': 'Sign up for the flu shot next week.'},
-        ],
-        'is_admin': is_admin
+        'announcements': page_obj,
+        'page_obj': page_obj,
+        'is_admin': is_admin,
+        'now': timezone.now(),
     }
     return render(request, 'core/announcements.html', context)
 
@@ -371,19 +439,32 @@ def announcements_view(request):
 @login_required
 def add_post(request):
     # (11.2, 11.4) Admin Only
-    if request.user.userprofile.is_admin and request.method == 'POST':
-        # Placeholder logic
-        messages.success(request, "Announcement posted successfully.")
+    is_admin = request.user.is_superuser or (hasattr(request.user, 'userprofile') and request.user.userprofile.is_admin)
+    if is_admin and request.method == 'POST':
+        post = Announcement(author=request.user)
+        try:
+            _apply_post_form(post, request.POST)
+            post.save()
+            messages.success(request, "Announcement posted successfully.")
+        except (KeyError, ValueError) as e:
+            messages.error(request, f"Could not post announcement: {e}")
         return redirect('announcements')
-    return render(request, 'core/announcements.html')  # Redirect back to the page
+    messages.error(request, "You do not have permission to add posts.")
+    return redirect('announcements')
 
 
 @login_required
 def edit_post(request, post_id):
     # (11.5) Admin Only
-    if request.user.userprofile.is_admin and request.method == 'POST':
-        # Placeholder logic
-        messages.success(request, f"Announcement {post_id} updated successfully.")
+    is_admin = request.user.is_superuser or (hasattr(request.user, 'userprofile') and request.user.userprofile.is_admin)
+    if is_admin and request.method == 'POST':
+        post = get_object_or_404(Announcement, pk=post_id)
+        try:
+            _apply_post_form(post, request.POST)
+            post.save()
+            messages.success(request, f"Announcement \"{post.title}\" updated successfully.")
+        except (KeyError, ValueError) as e:
+            messages.error(request, f"Could not update announcement: {e}")
         return redirect('announcements')
     messages.error(request, "You do not have permission to edit posts.")
     return redirect('announcements')
@@ -394,14 +475,14 @@ def edit_post(request, post_id):
 @login_required
 def admin_menu_view(request):
     # (5.0) Logic is handled by main_menu redirect. This view simply renders the admin template.
-    context = {'recent_announcement': "New protocol for inventory check starting tomorrow."}
+    context = {'recent_announcement': next(iter(recent_announcements(1)), None)}
     return render(request, 'core/admin_menu.html', context)
 
 
 @login_required
 def medicine_stock_view(request):
-    # (17.0)
-    medicines = Medicine.objects.all().order_by('name')
+    # (17.0) Total plus per-branch breakdown
+    medicines = Medicine.objects.with_stock().prefetch_related('branch_stocks__branch').order_by('name')
     context = {'medicines': medicines}
     return render(request, 'core/medicine_stock.html', context)
 
@@ -409,7 +490,7 @@ def medicine_stock_view(request):
 @login_required
 def edit_medicine_view(request, medicine_id):
     # (17.4, 17.5) Placeholder
-    medicine = get_object_or_404(Medicine, pk=medicine_id)
+    medicine = get_object_or_404(Medicine.objects.with_stock(), pk=medicine_id)
     if request.method == 'POST':
         # Placeholder update logic
         messages.success(request, f"{medicine.name} updated successfully.")
@@ -419,12 +500,36 @@ def edit_medicine_view(request, medicine_id):
     return render(request, 'core/edit_medicine.html', context)
 
 
+SALES_STATUSES = ('Processing', 'Shipped', 'Completed')
+
+
 @login_required
 def analytics_view(request):
-    # (18.0) Placeholder
+    # (18.0) Aggregates the totals stored when items were added; nothing is re-priced here
+    sales = Order.objects.filter(status__in=SALES_STATUSES)
+    monthly = (
+        sales.annotate(month=TruncMonth('order_date'))
+        .values('month')
+        .annotate(total=Sum('total_price'))
+        .order_by('month')
+    )
+    discounts = list(
+        sales.exclude(discount_type='')
+        .values('discount_type')
+        .annotate(orders=Count('id'), granted=Sum(F('discount') + F('vat_exemption')))
+        .order_by('discount_type')
+    )
+    top_sellers = (
+        OrderItem.objects.filter(order__status__in=SALES_STATUSES)
+        .values(name=F('medicine__name'))
+        .annotate(count=Sum('quantity'), revenue=Sum('line_total'))
+        .order_by('-count')[:5]
+    )
     context = {
-        'monthly_sales': [1200, 1500, 1800, 2500],
-        'top_sellers': [{'name': 'Paracetamol', 'count': 500}, {'name': 'Amoxicillin', 'count': 350}]
+        'monthly_sales': [row['total'] for row in monthly][-12:],
+        'discount_summary': discounts,
+        'discounts_granted': sum(row['granted'] for row in discounts),
+        'top_sellers': list(top_sellers),
     }
     return render(request, 'core/analytics.html', context)
 